@@ -0,0 +1,59 @@
+"""
+Плагин pytest: запуск части набора тестов в отдельном процессе.
+
+run_tests.sh --parallel запускает каждый проект несколькими процессами
+pytest с опциями --shard-id и --num-shards. Процесс оставляет себе
+каждый num-shards-й тест в порядке сбора, так что части не пересекаются
+и вместе дают весь набор. Тестовая база SQLite по умолчанию создаётся
+в памяти и уже своя у каждого процесса; если в TEST.NAME указан файл,
+к имени добавляется номер части.
+"""
+import pytest
+
+NO_TESTS_COLLECTED = 5
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('shard')
+    group.addoption('--shard-id', type=int, default=0,
+                    help='Номер части набора, начиная с 0.')
+    group.addoption('--num-shards', type=int, default=1,
+                    help='Сколько всего частей.')
+
+
+def pytest_configure(config):
+    num_shards = config.getoption('num_shards')
+    shard_id = config.getoption('shard_id')
+    if not 0 <= shard_id < num_shards:
+        raise pytest.UsageError(
+            '--shard-id должен быть от 0 до --num-shards - 1'
+        )
+    if num_shards == 1:
+        return
+    from django.conf import settings
+
+    for database in settings.DATABASES.values():
+        test = database.setdefault('TEST', {})
+        name = test.get('NAME')
+        if name and name != ':memory:' and not test.get('MIRROR'):
+            test['NAME'] = f'{name}_shard{shard_id}'
+
+
+def pytest_collection_modifyitems(config, items):
+    num_shards = config.getoption('num_shards')
+    if num_shards == 1:
+        return
+    shard_id = config.getoption('shard_id')
+    selected = items[shard_id::num_shards]
+    config.hook.pytest_deselected(items=[
+        item for index, item in enumerate(items)
+        if index % num_shards != shard_id
+    ])
+    items[:] = selected
+
+
+def pytest_sessionfinish(session, exitstatus):
+    """Части без тестов (тестов меньше, чем частей) не считаются ошибкой."""
+    if (session.config.getoption('num_shards') > 1
+            and exitstatus == NO_TESTS_COLLECTED):
+        session.exitstatus = 0
@@ -14,6 +14,47 @@ print_message () {
     echo -e "${left_filler_len// /$symbol}$message${right_filler_len// /$symbol}\033[0m"
 }
 
+# ./run_tests.sh --parallel [N] runs both projects at once, each split into
+# N pytest processes (the number of CPU cores by default). See pytest_shard.py.
+jobs=""
+if [[ "$1" == "--parallel" ]]; then
+    jobs=${2:-$(nproc)}
+    if [[ ! "$jobs" =~ ^[1-9][0-9]*$ ]]; then
+        print_message " Число процессов для --parallel должно быть целым положительным, получено: $jobs " "=" 1
+        exit 2
+    fi
+    log_dir=$(mktemp -d)
+    trap 'rm -rf "$log_dir"' EXIT
+fi
+
+start_shards () {
+    # Start the suite of the project (first argument) with the settings
+    # module (second argument) as $jobs background shards.
+    for ((shard = 0; shard < jobs; shard++)); do
+        (
+            cd "$1" && DJANGO_SETTINGS_MODULE="$2" PYTHONPATH="$PWD/..${PYTHONPATH:+:$PYTHONPATH}" \
+                pytest --tb=line -p pytest_shard --shard-id=$shard --num-shards=$jobs \
+                > "$log_dir/$1_$shard.log" 2>&1
+            echo $? > "$log_dir/$1_$shard.status"
+        ) &
+    done
+}
+
+run_pytest () {
+    # Run the suite of the project (first argument) in the current directory,
+    # or print the output of its shards in order and return the first failure.
+    if [[ -z "$jobs" ]]; then
+        pytest --tb=line 1>&2
+        return
+    fi
+    local status=0
+    for ((shard = 0; shard < jobs; shard++)); do
+        cat "$log_dir/$1_$shard.log" 1>&2
+        if [[ $status -eq 0 ]]; then status=$(cat "$log_dir/$1_$shard.status"); fi
+    done
+    return $status
+}
+
 
 if python -m flake8 --config=setup.cfg 1>&2;
 then
@@ -21,14 +62,19 @@ then
     echo $LF 1>&2
     if python structure_test.py
     then
+        if [[ -n "$jobs" ]]; then
+            start_shards ya_news "${DJANGO_SETTINGS_MODULE:-yanews.settings}"
+            start_shards ya_note yanote.settings
+            wait
+        fi
         cd ya_news
         export DJANGO_SETTINGS_MODULE="${DJANGO_SETTINGS_MODULE:="yanews.settings"}"
-        if pytest --tb=line 1>&2;
+        if run_pytest ya_news;
         then
             cd ../ya_note
             unset DJANGO_SETTINGS_MODULE
             export DJANGO_SETTINGS_MODULE="${DJANGO_SETTINGS_MODULE:="yanote.settings"}"
-            if pytest --tb=line 1>&2;
+            if run_pytest ya_note;
             then
                 exit 0
             else
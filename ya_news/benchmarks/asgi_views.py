@@ -0,0 +1,170 @@
+"""
+Синхронные представления под WSGI и ASGI против асинхронных под ASGI.
+
+Запросы подаются прямо в WSGIHandler (пулом потоков) и в ASGIHandler
+(задачами asyncio) без сетевого сервера: так сравнивается только
+работа Django, без шума сокетов. Каждый вариант получает одинаковый
+набор страниц новостей и порций комментариев.
+Запуск из каталога ya_news:
+
+    python -m benchmarks.asgi_views --requests 2000 --concurrency 100
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from pathlib import Path
+
+import django
+
+
+def prepare_database(news_count, comments_per_news):
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from django.core.management import call_command
+    from django.db import connections
+
+    from news.models import Comment, News
+
+    settings.DATABASES['default']['NAME'] = str(
+        Path(tempfile.mkdtemp()) / 'db.sqlite3'
+    )
+    call_command('migrate', verbosity=0)
+    News.objects.bulk_create(
+        News(title=f'Новость {number}', text='Текст новости ' * 20)
+        for number in range(news_count)
+    )
+    author = get_user_model().objects.create(username='author')
+    Comment.objects.bulk_create(
+        Comment(news=news, author=author, text='Комментарий ' * 5)
+        for news in News.objects.all()
+        for _ in range(comments_per_news)
+    )
+    News.objects.update(comment_count=comments_per_news)
+    connections.close_all()
+    return list(News.objects.values_list('pk', flat=True))
+
+
+def make_paths(prefix, news_ids, count, seed):
+    rng = random.Random(seed)
+    pages = [
+        f'{prefix}/',
+        f'{prefix}/news/{{}}/',
+        f'{prefix}/news/{{}}/comments/',
+    ]
+    return [
+        rng.choice(pages).format(rng.choice(news_ids)) for _ in range(count)
+    ]
+
+
+def run_wsgi(paths, concurrency):
+    from django.core.handlers.wsgi import WSGIHandler
+
+    handler = WSGIHandler()
+
+    def request(path):
+        environ = {
+            'REQUEST_METHOD': 'GET',
+            'PATH_INFO': path,
+            'QUERY_STRING': '',
+            'SERVER_NAME': 'localhost',
+            'SERVER_PORT': '80',
+            'HTTP_HOST': 'localhost',
+            'wsgi.input': BytesIO(),
+            'wsgi.url_scheme': 'http',
+        }
+        statuses = []
+        started = time.perf_counter()
+        body = b''.join(handler(
+            environ, lambda status, headers: statuses.append(status)
+        ))
+        assert statuses[0].startswith('200'), (path, statuses, body[:200])
+        return time.perf_counter() - started
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return list(executor.map(request, paths))
+
+
+async def run_asgi(paths, concurrency):
+    from django.core.handlers.asgi import ASGIHandler
+
+    handler = ASGIHandler()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def request(path):
+        scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': 'GET',
+            'scheme': 'http',
+            'path': path,
+            'raw_path': path.encode(),
+            'query_string': b'',
+            'root_path': '',
+            'headers': [(b'host', b'localhost')],
+            'client': ('127.0.0.1', 50000),
+            'server': ('localhost', 80),
+        }
+        messages = []
+
+        async def receive():
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+        async def send(message):
+            messages.append(message)
+
+        async with semaphore:
+            started = time.perf_counter()
+            await handler(scope, receive, send)
+            assert messages[0]['status'] == 200, (path, messages[0])
+            return time.perf_counter() - started
+
+    return await asyncio.gather(*(request(path) for path in paths))
+
+
+def report(name, seconds, latencies):
+    latencies = sorted(latencies)
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(f'{name:22} {len(latencies) / seconds:8.0f} запросов/с   '
+          f'p50 {quantiles[49] * 1000:7.1f} мс   '
+          f'p99 {quantiles[98] * 1000:7.1f} мс')
+
+
+def timed(function, *args):
+    started = time.perf_counter()
+    latencies = function(*args)
+    return time.perf_counter() - started, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=100)
+    parser.add_argument('--news', type=int, default=200)
+    parser.add_argument('--comments', type=int, default=30)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yanews.settings')
+    django.setup()
+    news_ids = prepare_database(args.news, args.comments)
+    print(f'Запросов: {args.requests}, одновременно: {args.concurrency}')
+    sync_paths = make_paths('', news_ids, args.requests, args.seed)
+    async_paths = make_paths('/async', news_ids, args.requests, args.seed)
+    report('WSGI, sync views', *timed(run_wsgi, sync_paths, args.concurrency))
+    report('ASGI, sync views', *timed(
+        lambda: asyncio.run(run_asgi(sync_paths, args.concurrency))
+    ))
+    report('ASGI, async views', *timed(
+        lambda: asyncio.run(run_asgi(async_paths, args.concurrency))
+    ))
+
+
+if __name__ == '__main__':
+    main()
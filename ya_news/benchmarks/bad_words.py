@@ -0,0 +1,74 @@
+"""
+Сравнение фильтра запрещённых слов с прежней проверкой в цикле.
+
+Запуск из каталога ya_news:
+
+    python -m benchmarks.bad_words --words 5000 --length 20000
+"""
+import argparse
+import random
+from timeit import timeit
+
+from news.bad_words import BadWordsFilter
+
+ALPHABET = 'абвгдежзийклмнопрстуфхцчшщъыьэюя'
+
+
+def naive_search(text, words):
+    """Проверка, которой раньше пользовалась CommentForm.clean_text."""
+    lowered_text = text.lower()
+    for word in words:
+        if word in lowered_text:
+            return word
+    return None
+
+
+def random_word(rng):
+    return ''.join(rng.choices(ALPHABET, k=rng.randint(5, 12)))
+
+
+def make_comment(rng, length, banned):
+    words = []
+    while sum(len(word) + 1 for word in words) < length:
+        word = random_word(rng)
+        if word not in banned:
+            words.append(word.capitalize() if rng.random() < 0.1 else word)
+    return ' '.join(words)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--words', type=int, default=5000,
+                        help='Размер словаря запрещённых слов.')
+    parser.add_argument('--length', type=int, default=20000,
+                        help='Длина комментария в символах.')
+    parser.add_argument('--comments', type=int, default=20,
+                        help='Сколько комментариев проверять.')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    banned = {random_word(rng) for _ in range(args.words)}
+    comments = [
+        make_comment(rng, args.length, banned) for _ in range(args.comments)
+    ]
+    build_seconds = timeit(lambda: BadWordsFilter(banned), number=1)
+    bad_words_filter = BadWordsFilter(banned)
+    naive_seconds = timeit(
+        lambda: [naive_search(comment, banned) for comment in comments],
+        number=1,
+    )
+    compiled_seconds = timeit(
+        lambda: [bad_words_filter.search(comment) for comment in comments],
+        number=1,
+    )
+    print(f'Слов в словаре: {len(banned)}, '
+          f'комментариев: {len(comments)} по ~{args.length} символов')
+    print(f'Сборка фильтра:  {build_seconds * 1000:9.1f} мс (один раз)')
+    print(f'Цикл по словам:  {naive_seconds * 1000:9.1f} мс')
+    print(f'Один проход:     {compiled_seconds * 1000:9.1f} мс')
+    print(f'Ускорение:       {naive_seconds / compiled_seconds:9.1f}x')
+
+
+if __name__ == '__main__':
+    main()
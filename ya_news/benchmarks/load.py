@@ -0,0 +1,102 @@
+"""
+Нагрузочный тест YaNews: локальный сервер, сценарии пользователей, перцентили.
+
+Создаёт временную базу с синтетическими новостями и комментариями,
+запускает локальный сервер и гоняет на него виртуальных пользователей.
+Каждый входит на сайт и по кругу проходит сценарий: главная, новость,
+комментарий, поиск его в ленте комментариев, правка и удаление.
+Сервер, замер и отчёт — в yacommon.loadtest.
+Запуск из каталога ya_news:
+
+    python -m benchmarks.load --users 20 --seconds 30 --output base.json
+    python -m benchmarks.load --users 20 --seconds 30 --compare base.json
+
+benchmarks/baseline.json — прогон с параметрами по умолчанию; они и версии
+Python и Django записаны в его meta.
+"""
+import json
+import random
+from functools import partial
+from pathlib import Path
+
+from yacommon import loadtest
+from yacommon.loadtest import FlowError
+
+
+def find_comment(client, news_id, text):
+    """Ищет id своего комментария, листая ленту, как «Показать ещё»."""
+    cursor = ''
+    while True:
+        page = json.loads(client.get(
+            'news:comments',
+            f'/news/{news_id}/comments/?format=json&cursor={cursor}',
+        ))
+        for comment in page['comments']:
+            if comment['text'] == text:
+                return comment['id']
+        cursor = page['next_cursor']
+        if not cursor:
+            raise FlowError(f'Комментарий не найден в новости {news_id}')
+
+
+def flow(client, rng, news_ids):
+    """Главная, новость, комментарий, правка и удаление комментария."""
+    news_id = rng.choice(news_ids)
+    detail = f'/news/{news_id}/'
+    client.get('news:home', '/')
+    client.get('news:detail', detail)
+    text = f'Комментарий {rng.getrandbits(48):012x}'
+    client.post('news:detail', detail, {'text': text})
+    comment_id = find_comment(client, news_id, text)
+    edit = f'/edit_comment/{comment_id}/'
+    client.get('news:edit', edit)
+    client.post('news:edit', edit, {'text': f'{text} (исправлен)'})
+    delete = f'/delete_comment/{comment_id}/'
+    client.get('news:delete', delete)
+    client.post('news:delete', delete, {})
+
+
+def add_arguments(parser):
+    parser.add_argument('--news', type=int, default=10000)
+    parser.add_argument('--comments', type=int, default=20,
+                        help='Комментариев к каждой новости.')
+
+
+def seed(args):
+    """Синтетические новости и комментарии пользователей."""
+    from django.contrib.auth import get_user_model
+
+    from news.models import Comment, News
+
+    author_ids = list(get_user_model().objects.values_list('pk', flat=True))
+    News.objects.bulk_create(
+        (News(title=f'Новость {number}', text='Текст новости ' * 20)
+         for number in range(args.news)),
+        batch_size=1000,
+    )
+    news_ids = list(News.objects.values_list('pk', flat=True))
+    rng = random.Random(args.seed)
+    Comment.objects.bulk_create(
+        (Comment(news_id=news_id, author_id=rng.choice(author_ids),
+                 text='Комментарий ' * 5)
+         for news_id in news_ids for _ in range(args.comments)),
+        batch_size=1000,
+    )
+    News.objects.update(comment_count=args.comments)
+    print(f'Новостей: {args.news}, комментариев к каждой: {args.comments}')
+    return (
+        partial(flow, news_ids=news_ids),
+        {'news': args.news, 'comments': args.comments},
+    )
+
+
+if __name__ == '__main__':
+    loadtest.main(
+        project='ya_news',
+        settings_module='yanews.settings',
+        module='benchmarks.load',
+        directory=Path(__file__).resolve().parent.parent,
+        description=__doc__,
+        add_arguments=add_arguments,
+        seed=seed,
+    )
@@ -0,0 +1,131 @@
+"""
+Пропускная способность SQLite при параллельных чтениях и записях.
+
+Сравнивает профиль базы по умолчанию с DATABASE_PROFILE=production.
+Каждый профиль получает свою временную базу; потоки-читатели
+выбирают главную страницу и комментарии, потоки-писатели добавляют
+комментарии так же, как NewsComment. После каждой операции соединение
+закрывается, если этого требует CONN_MAX_AGE, как в конце запроса.
+Запуск из каталога ya_news:
+
+    python -m benchmarks.sqlite_concurrency --readers 8 --writers 4
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from pathlib import Path
+from threading import Event, Thread
+
+import django
+
+
+def read(news_ids):
+    from news.models import Comment, News
+
+    list(News.objects.order_by('-date', '-id')[:10])
+    list(
+        Comment.objects.filter(news_id=random.choice(news_ids))
+        .select_related('author').order_by('created', 'id')[:20]
+    )
+
+
+def write(news_ids, author_id):
+    from django.db import transaction
+
+    from news.models import Comment, News
+
+    news_id = random.choice(news_ids)
+    with transaction.atomic():
+        News.objects.filter(pk=news_id).change_comment_count(1)
+        Comment.objects.create(
+            news_id=news_id, author_id=author_id, text='Комментарий'
+        )
+
+
+def worker(operation, args, stop, results):
+    from django.db import OperationalError, close_old_connections, connection
+
+    done = errors = 0
+    while not stop.is_set():
+        try:
+            operation(*args)
+            done += 1
+        except OperationalError:
+            errors += 1
+        close_old_connections()
+    connection.close()
+    results.append((operation.__name__, done, errors))
+
+
+def run_profile(name, pragmas, conn_max_age, args):
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from django.core.management import call_command
+    from django.db import connections
+
+    from news.models import News
+
+    directory = tempfile.mkdtemp()
+    connections.close_all()
+    database = settings.DATABASES['default']
+    database['NAME'] = str(Path(directory) / 'db.sqlite3')
+    database['CONN_MAX_AGE'] = conn_max_age
+    settings.SQLITE_PRAGMAS = pragmas
+    call_command('migrate', verbosity=0)
+    News.objects.bulk_create(
+        News(title=f'Новость {number}', text='Текст') for number in range(100)
+    )
+    news_ids = list(News.objects.values_list('pk', flat=True))
+    author = get_user_model().objects.create(username='author')
+    connections.close_all()
+
+    stop = Event()
+    results = []
+    threads = [
+        Thread(target=worker, args=(read, (news_ids,), stop, results))
+        for _ in range(args.readers)
+    ] + [
+        Thread(target=worker, args=(write, (news_ids, author.pk), stop,
+                                    results))
+        for _ in range(args.writers)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    totals = {'read': [0, 0], 'write': [0, 0]}
+    for operation, done, errors in results:
+        totals[operation][0] += done
+        totals[operation][1] += errors
+    print(f'{name}:')
+    for operation, (done, errors) in totals.items():
+        print(f'  {operation:5} {done / args.seconds:9.0f} оп/с, '
+              f'ошибок «database is locked»: {errors}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--seconds', type=float, default=5)
+    args = parser.parse_args()
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yanews.settings')
+    django.setup()
+    from django.conf import settings
+
+    print(f'Читателей: {args.readers}, писателей: {args.writers}, '
+          f'{args.seconds:g} с на профиль')
+    run_profile('development', {}, 0, args)
+    run_profile(
+        'production', settings.SQLITE_PRODUCTION_PRAGMAS, 600, args
+    )
+
+
+if __name__ == '__main__':
+    main()
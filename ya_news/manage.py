@@ -2,6 +2,10 @@
 """Django's command-line utility for administrative tasks."""
 import os
 import sys
+from pathlib import Path
+
+# Общий код YaNews и YaNote — пакет yacommon в корне репозитория.
+sys.path.append(str(Path(__file__).resolve().parent.parent))
 
 
 def main():
@@ -5,3 +5,19 @@ class NewsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'news'
     verbose_name = 'Новости'
+
+    def ready(self):
+        from django.conf import settings
+        from django.core.exceptions import ImproperlyConfigured
+
+        import yacommon.signals  # noqa: F401
+        from yacommon.template_cache import warm
+
+        from . import signals  # noqa: F401
+        from .forms import bad_words
+        # Собираем фильтр при старте, а не на первом комментарии.
+        bad_words.get_filter()
+        if settings.TEMPLATE_PROFILE == 'production':
+            errors = warm()
+            if errors:
+                raise ImproperlyConfigured('\n'.join(errors))
@@ -0,0 +1,80 @@
+"""
+Асинхронные варианты главной страницы, страницы новости и порции комментариев.
+
+ORM в Django 3.2 только синхронный, поэтому всё, что обращается к базе
+(пользователь из сессии, выборка страницы, ETag), выполняется за один
+переход в поток через sync_to_async, а шаблон рендерится уже в цикле
+событий из загруженных списков. Данные и шаблоны те же, что у синхронных
+представлений из views.py; кэш главной страницы здесь не используется.
+"""
+from asgiref.sync import sync_to_async
+from django.http import HttpResponseNotAllowed
+from django.utils.cache import get_conditional_response, quote_etag
+from django.views.generic.detail import SingleObjectMixin
+from django.views.generic.list import MultipleObjectMixin
+
+from yacommon.instrumentation import phase
+
+from .views import NewsComments, NewsDetail, NewsList, news_etag
+
+SAFE_METHODS = ('GET', 'HEAD')
+
+
+def load_context(view_class, request, kwargs, etag_func=None):
+    """
+    Выполняет в потоке всю работу представления, кроме рендеринга.
+
+    Ленивые объекты запроса загружаются здесь, чтобы шаблон не обращался
+    к базе. Возвращает (ответ 304 или None, view, context, etag).
+    """
+    request.user.is_authenticated
+    etag = None
+    if etag_func is not None:
+        etag = etag_func(request, **kwargs)
+        etag = quote_etag(etag) if etag else None
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            return not_modified, None, None, etag
+    view = view_class()
+    view.setup(request, **kwargs)
+    if isinstance(view, MultipleObjectMixin):
+        view.object_list = view.get_queryset()
+        context = view.get_context_data()
+    elif isinstance(view, SingleObjectMixin):
+        view.object = view.get_object()
+        context = view.get_context_data(object=view.object)
+    else:
+        context = view.get_context_data(**kwargs)
+    return None, view, context, etag
+
+
+async def render_async(view_class, request, etag_func=None, **kwargs):
+    """Представление за один переход в поток; рендеринг — в цикле событий."""
+    if request.method not in SAFE_METHODS:
+        return HttpResponseNotAllowed(SAFE_METHODS)
+    not_modified, view, context, etag = await sync_to_async(load_context)(
+        view_class, request, kwargs, etag_func
+    )
+    if not_modified is not None:
+        return not_modified
+    response = view.render_to_response(context)
+    if hasattr(response, 'render'):
+        with phase('render'):
+            response.render()
+    if etag is not None:
+        response.setdefault('ETag', etag)
+    return response
+
+
+async def news_list(request):
+    return await render_async(NewsList, request)
+
+
+async def news_detail(request, pk):
+    return await render_async(
+        NewsDetail, request, etag_func=news_etag, pk=pk
+    )
+
+
+async def news_comments(request, pk):
+    return await render_async(NewsComments, request, pk=pk)
@@ -0,0 +1,125 @@
+import logging
+import os
+import re
+from threading import Lock
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+logger = logging.getLogger(__name__)
+
+
+def normalize(text):
+    """Приводит текст к виду для сравнения: без регистра, «ё» как «е»."""
+    return text.casefold().replace('ё', 'е')
+
+
+def build_pattern(words, whole_words=False):
+    """
+    Собирает слова в одно регулярное выражение по префиксному дереву.
+
+    Общие префиксы слов проверяются один раз, поэтому стоимость проверки
+    позиции в тексте зависит от длины слов, а не от их количества.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+    end = r'(?!\w)' if whole_words else ''
+    return r'(?<!\w)' + _trie_to_regex(trie, end)
+
+
+def _trie_to_regex(node, end):
+    if '' in node and not end:
+        # Короткое слово уже найдено, продолжения проверять незачем.
+        return ''
+    branches = [
+        end if char == '' else re.escape(char) + _trie_to_regex(child, end)
+        for char, child in sorted(node.items())
+    ]
+    if len(branches) == 1:
+        return branches[0]
+    return '(?:{})'.format('|'.join(branches))
+
+
+class BadWordsFilter:
+    """
+    Поиск запрещённых слов за один проход по тексту.
+
+    По умолчанию слово ищется с начала слова текста, так что ловятся и его
+    формы: «редиска», «редиской». С whole_words=True — только целиком.
+    """
+
+    def __init__(self, words, whole_words=False):
+        self.words = frozenset(
+            normalize(word.strip()) for word in words if word.strip()
+        )
+        self.pattern = None
+        if self.words:
+            self.pattern = re.compile(build_pattern(self.words, whole_words))
+
+    def search(self, text):
+        """Возвращает первое найденное запрещённое слово или None."""
+        if self.pattern is None:
+            return None
+        match = self.pattern.search(normalize(text))
+        return match.group() if match else None
+
+
+def read_words(path):
+    """Слова из файла: по одному в строке, «#» начинает комментарий."""
+    with open(path, encoding='utf-8') as file:
+        return [line.split('#', 1)[0].strip() for line in file]
+
+
+class BadWords:
+    """
+    Текущий фильтр: встроенные слова плюс файл из BAD_WORDS_FILE.
+
+    Фильтр собирается один раз и пересобирается, только когда файл
+    изменился на диске или настройка указывает на другой файл. Если файл
+    не читается при старте, сайт не запускается; если позже (например,
+    его как раз перезаписывают), остаётся последний собранный фильтр.
+    """
+
+    def __init__(self, words):
+        self.words = tuple(words)
+        self._lock = Lock()
+        self._stamp = None
+        self._filter = None
+
+    def _get_stamp(self):
+        path = settings.BAD_WORDS_FILE
+        whole_words = settings.BAD_WORDS_WHOLE_WORDS
+        if not path:
+            return None, None, whole_words
+        return path, os.stat(path).st_mtime_ns, whole_words
+
+    def get_filter(self):
+        try:
+            stamp = self._get_stamp()
+            if self._filter is None or stamp != self._stamp:
+                with self._lock:
+                    if self._filter is None or stamp != self._stamp:
+                        self._rebuild(stamp)
+        except OSError as error:
+            if self._filter is None:
+                raise ImproperlyConfigured(
+                    f'Не удалось прочитать BAD_WORDS_FILE: {error}'
+                )
+            logger.warning(
+                'Не удалось прочитать BAD_WORDS_FILE, используется '
+                'прежний словарь: %s', error
+            )
+        return self._filter
+
+    def _rebuild(self, stamp):
+        path, _, whole_words = stamp
+        words = self.words + tuple(read_words(path) if path else ())
+        self._filter = BadWordsFilter(words, whole_words)
+        self._stamp = stamp
+
+    def search(self, text):
+        return self.get_filter().search(text)
@@ -0,0 +1,10 @@
+from django.conf import settings
+
+
+def fragment_cache(request):
+    """Параметры кэша фрагментов для тега {% cache %} в шаблонах."""
+    return {
+        'FRAGMENT_CACHE_ALIAS': settings.FRAGMENT_CACHE_ALIAS,
+        'FRAGMENT_CACHE_TIMEOUT': settings.FRAGMENT_CACHE_TIMEOUT,
+        'FRAGMENT_CACHE_VERSION': settings.FRAGMENT_CACHE_VERSION,
+    }
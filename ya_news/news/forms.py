@@ -1,6 +1,10 @@
+from django.conf import settings
 from django.forms import ModelForm
 from django.core.exceptions import ValidationError
 
+from yacommon.instrumentation import TimedFormMixin
+
+from .bad_words import BadWords
 from .models import Comment
 
 BAD_WORDS = (
@@ -10,18 +14,24 @@ BAD_WORDS = (
 )
 WARNING = 'Не ругайтесь!'
 
+bad_words = BadWords(BAD_WORDS)
+
 
-class CommentForm(ModelForm):
+class CommentForm(TimedFormMixin, ModelForm):
 
     class Meta:
         model = Comment
         fields = ('text',)
 
     def clean_text(self):
-        """Не позволяем ругаться в комментариях."""
+        """
+        Не позволяем ругаться в комментариях.
+
+        При фоновой модерации словарь проверяет пул модерации.
+        """
         text = self.cleaned_data['text']
-        lowered_text = text.lower()
-        for word in BAD_WORDS:
-            if word in lowered_text:
-                raise ValidationError(WARNING)
+        if settings.COMMENT_MODERATION == 'async':
+            return text
+        if bad_words.search(text):
+            raise ValidationError(WARNING)
         return text
@@ -0,0 +1,34 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.utils import make_template_fragment_key
+from django.db import transaction
+
+NEWS_CARD = 'news_card'
+COMMENT_BLOCK = 'comment_block'
+
+
+def fragment_key(fragment_name, pk):
+    """Ключ фрагмента так, как его строит тег {% cache %} в шаблонах."""
+    return make_template_fragment_key(
+        fragment_name, [pk, settings.FRAGMENT_CACHE_VERSION]
+    )
+
+
+def invalidate(*keys):
+    """
+    Удаляет фрагменты из кэша.
+
+    Удаление повторяется после коммита транзакции, чтобы параллельный
+    запрос не успел положить в кэш ещё не изменённые данные.
+    """
+    cache = caches[settings.FRAGMENT_CACHE_ALIAS]
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def invalidate_news(*pks):
+    invalidate(*(fragment_key(NEWS_CARD, pk) for pk in pks))
+
+
+def invalidate_comment(pk):
+    invalidate(fragment_key(COMMENT_BLOCK, pk))
@@ -0,0 +1,179 @@
+"""
+Массовая загрузка комментариев из JSONL или CSV.
+
+Запись содержит id новости, имя автора и текст:
+{"news": 1, "author": "username", "text": "..."}. Каждая запись
+проверяется правилами CommentForm, а годные сохраняются через bulk_create
+пачками, каждая в своей транзакции.
+"""
+import csv
+import json
+import time
+from collections import Counter
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from . import moderation
+from .forms import CommentForm
+from .models import Comment, News
+from .signals import comments_changed
+
+FORMATS = ('jsonl', 'csv')
+MAX_REPORTED_REJECTS = 100
+
+User = get_user_model()
+
+
+class IngestReport:
+    """Итоги загрузки: сколько записей сохранено и почему отклонены."""
+
+    def __init__(self):
+        self.created = 0
+        self.rejected = 0
+        self.rejects = []
+        self.started = time.monotonic()
+        self.seconds = 0
+
+    def reject(self, line, reason):
+        self.rejected += 1
+        if len(self.rejects) < MAX_REPORTED_REJECTS:
+            self.rejects.append((line, reason))
+
+    @property
+    def rate(self):
+        total = self.created + self.rejected
+        return total / self.seconds if self.seconds else 0
+
+    def as_dict(self):
+        return {
+            'created': self.created,
+            'rejected': self.rejected,
+            'seconds': round(self.seconds, 3),
+            'records_per_second': round(self.rate),
+            'rejects': [
+                {'line': line, 'reason': reason}
+                for line, reason in self.rejects
+            ],
+        }
+
+
+class CommentValidator:
+    """
+    Правила CommentForm без создания формы на каждую запись.
+
+    Проверяются поля формы и их clean_<поле>; построение ModelForm
+    с копированием полей стоило бы дороже самой вставки в базу.
+    """
+
+    def __init__(self):
+        self.form = CommentForm()
+
+    def clean(self, data):
+        """Возвращает (cleaned_data, None) или (None, текст ошибок)."""
+        form = self.form
+        form.cleaned_data = {}
+        try:
+            for name, field in form.fields.items():
+                form.cleaned_data[name] = field.clean(data.get(name))
+                clean_field = getattr(form, f'clean_{name}', None)
+                if clean_field is not None:
+                    form.cleaned_data[name] = clean_field()
+        except ValidationError as error:
+            return None, '; '.join(error.messages)
+        return form.cleaned_data, None
+
+
+def read_records(stream, file_format):
+    """Построчно читает записи, не загружая файл в память целиком."""
+    if file_format == 'csv':
+        yield from csv.DictReader(stream)
+        return
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            record = None
+        yield record if isinstance(record, dict) else None
+
+
+def ingest_comments(records, chunk_size=1000):
+    """Загружает комментарии пачками по chunk_size, возвращает отчёт."""
+    if chunk_size < 1:
+        raise ValueError('chunk_size должен быть не меньше 1')
+    report = IngestReport()
+    numbered = enumerate(records, start=1)
+    while True:
+        chunk = list(islice(numbered, chunk_size))
+        if not chunk:
+            break
+        ingest_chunk(chunk, report)
+    report.seconds = time.monotonic() - report.started
+    return report
+
+
+def ingest_chunk(chunk, report):
+    records = [(line, record) for line, record in chunk if record]
+    for line, record in chunk:
+        if not record:
+            report.reject(line, 'Запись не разобрана')
+    news_ids = set(News.objects.filter(
+        pk__in={_to_int(record.get('news')) for _, record in records}
+    ).values_list('pk', flat=True))
+    authors = dict(User.objects.filter(
+        username__in={record.get('author') for _, record in records}
+    ).values_list('username', 'pk'))
+    status = (
+        Comment.Status.PENDING if moderation.is_async()
+        else Comment.Status.PUBLISHED
+    )
+    validator = CommentValidator()
+    comments = []
+    for line, record in records:
+        comment = build_comment(
+            record, news_ids, authors, validator, report, line
+        )
+        if comment is not None:
+            comment.status = status
+            comments.append(comment)
+    if not comments:
+        return
+    with transaction.atomic():
+        Comment.objects.bulk_create(comments, batch_size=len(comments))
+        per_news = Counter(comment.news_id for comment in comments)
+        if status == Comment.Status.PUBLISHED:
+            for news_id, count in per_news.items():
+                News.objects.filter(pk=news_id).change_comment_count(count)
+        else:
+            transaction.on_commit(moderation.notify)
+        comments_changed(list(per_news))
+    report.created += len(comments)
+
+
+def build_comment(record, news_ids, authors, validator, report, line):
+    """Проверяет запись правилами CommentForm и строит комментарий."""
+    news_id = _to_int(record.get('news'))
+    if news_id not in news_ids:
+        report.reject(line, f'Новость {record.get("news")!r} не найдена')
+        return None
+    author_id = authors.get(record.get('author'))
+    if author_id is None:
+        report.reject(line, f'Автор {record.get("author")!r} не найден')
+        return None
+    cleaned_data, errors = validator.clean(record)
+    if errors:
+        report.reject(line, errors)
+        return None
+    return Comment(news_id=news_id, author_id=author_id, **cleaned_data)
+
+
+def _to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,102 @@
+import os
+import time
+from multiprocessing import Pool
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.utils import timezone
+
+from yacommon import synthetic
+from yacommon.bulk import insert, next_id
+from yacommon.streaming import raw_timestamps
+
+from news import synthetic as news_synthetic
+from news.models import Comment, News
+from news.search import get_backend
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет базу синтетическими пользователями, новостями '
+        'и комментариями для проверки на больших объёмах.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10000)
+        parser.add_argument('--news', type=int, default=100000)
+        parser.add_argument(
+            '--comments', type=int, default=1000000,
+            help='Всего комментариев; по новостям и авторам они '
+                 'распределяются по закону Ципфа.',
+        )
+        parser.add_argument(
+            '--zipf', type=float, default=1.1,
+            help='Показатель распределения: чем больше, тем длиннее хвост.',
+        )
+        parser.add_argument(
+            '--days', type=int, default=365,
+            help='За сколько последних дней выходили новости.',
+        )
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument(
+            '--processes', type=int, default=os.cpu_count(),
+            help='Сколько процессов генерируют строки.',
+        )
+        parser.add_argument('--chunk-size', type=int, default=10000)
+
+    def handle(self, *args, users, news, comments, zipf, days, seed,
+               processes, chunk_size, **options):
+        if comments and not (users and news):
+            raise CommandError(
+                'Комментариям нужны новости и авторы: задайте --news '
+                'и --users больше нуля.'
+            )
+        started = time.monotonic()
+        plan = news_synthetic.Plan(
+            seed, users, news, comments, zipf, days, timezone.localtime(),
+            next_id(User), next_id(News), next_id(Comment),
+        )
+        password = make_password(None)
+        # Дочерние процессы не должны наследовать открытые соединения.
+        connections.close_all()
+        # Comment.created — auto_now_add, а время задаёт генератор.
+        with Pool(processes, synthetic.init_worker, (plan,)) as pool, \
+                raw_timestamps():
+            counts = {
+                'auth.User': insert(
+                    pool, User, synthetic.make_users, users, chunk_size,
+                    lambda row: User(
+                        id=row[0], username=row[1], password=password
+                    ),
+                ),
+                'news.News': insert(
+                    pool, News, news_synthetic.make_news, news, chunk_size,
+                    lambda row: News(
+                        id=row[0], title=row[1], text=row[2], date=row[3],
+                        comment_count=row[4],
+                    ),
+                ),
+                'news.Comment': insert(
+                    pool, Comment, news_synthetic.make_comments, comments,
+                    chunk_size,
+                    lambda row: Comment(
+                        id=row[0], news_id=row[1], author_id=row[2],
+                        text=row[3], created=row[4],
+                    ),
+                ),
+            }
+        if news:
+            # bulk_create не отправляет сигналы, индекс строим заново.
+            get_backend().rebuild()
+        seconds = time.monotonic() - started
+        total = sum(counts.values())
+        for label, count in counts.items():
+            self.stdout.write(f'{label}: {count}')
+        self.stdout.write(
+            f'Создано объектов: {total} за {seconds:.1f} с '
+            f'({total / seconds if seconds else 0:.0f} объектов/с).'
+        )
@@ -0,0 +1,45 @@
+import sys
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from news.ingest import FORMATS, ingest_comments, read_records
+
+
+class Command(BaseCommand):
+    help = 'Загружает комментарии из файла JSONL или CSV.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', help='Путь к файлу или «-» для чтения из stdin.'
+        )
+        parser.add_argument(
+            '--format', choices=FORMATS, dest='file_format',
+            help='Формат файла; по умолчанию — по расширению.',
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=1000,
+            help='Сколько записей сохранять за одну транзакцию.',
+        )
+
+    def handle(self, *args, path, file_format, chunk_size, **options):
+        file_format = file_format or Path(path).suffix.lstrip('.') or 'jsonl'
+        if file_format not in FORMATS:
+            raise CommandError(f'Неизвестный формат файла: {file_format}')
+        if chunk_size < 1:
+            raise CommandError('--chunk-size должен быть не меньше 1')
+        if path == '-':
+            report = ingest_comments(
+                read_records(sys.stdin, file_format), chunk_size
+            )
+        else:
+            with open(path, encoding='utf-8', newline='') as stream:
+                report = ingest_comments(
+                    read_records(stream, file_format), chunk_size
+                )
+        for line, reason in report.rejects:
+            self.stderr.write(f'Строка {line}: {reason}')
+        self.stdout.write(
+            f'Загружено: {report.created}, отклонено: {report.rejected} '
+            f'за {report.seconds:.1f} с ({report.rate:.0f} записей/с).'
+        )
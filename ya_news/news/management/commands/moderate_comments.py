@@ -0,0 +1,39 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from news.moderation import ModerationPool, moderate_pending
+
+
+class Command(BaseCommand):
+    help = 'Разбирает очередь комментариев на модерации.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Разобрать текущую очередь и завершиться.',
+        )
+        parser.add_argument(
+            '--workers', type=int,
+            default=settings.COMMENT_MODERATION_WORKERS,
+        )
+        parser.add_argument(
+            '--batch-size', type=int,
+            default=settings.COMMENT_MODERATION_BATCH_SIZE,
+        )
+
+    def handle(self, *args, once, workers, batch_size, **options):
+        if once:
+            total = moderate_pending(batch_size)
+            self.stdout.write(f'Проверено комментариев: {total}.')
+            return
+        pool = ModerationPool(
+            workers, batch_size, settings.COMMENT_MODERATION_POLL_INTERVAL
+        ).start()
+        self.stdout.write('Пул модерации запущен, Ctrl+C для остановки.')
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pool.stop()
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from news.models import News
+from news.search import get_backend
+
+
+class Command(BaseCommand):
+    help = (
+        'Заново строит поисковый индекс новостей, например после '
+        'загрузки через bulk_create.'
+    )
+
+    def handle(self, *args, **options):
+        get_backend().rebuild()
+        self.stdout.write(
+            f'Проиндексировано новостей: {News.objects.count()}.'
+        )
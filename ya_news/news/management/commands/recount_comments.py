@@ -0,0 +1,67 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from news.models import Comment, News
+from news.signals import comments_changed
+
+
+def actual_comment_count():
+    """Выражение с числом опубликованных комментариев новости."""
+    total = Comment.objects.filter(
+        news=OuterRef('pk'), status=Comment.Status.PUBLISHED
+    ).order_by().values('news').annotate(total=Count('id')).values('total')
+    return Coalesce(Subquery(total), 0)
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает News.comment_count и исправляет расхождения '
+        'с реальным числом комментариев.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=10000,
+            help='Сколько новостей проверять за одну транзакцию.',
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только найти расхождения, ничего не исправляя.',
+        )
+
+    def handle(self, *args, batch_size, dry_run, **options):
+        checked = repaired = 0
+        last_pk = 0
+        while True:
+            batch = list(
+                News.objects.filter(pk__gt=last_pk)
+                .order_by('pk')
+                .values_list('pk', flat=True)[:batch_size]
+            )
+            if not batch:
+                break
+            last_pk = batch[-1]
+            checked += len(batch)
+            repaired += self.repair(batch, dry_run)
+        verb = 'Найдено' if dry_run else 'Исправлено'
+        self.stdout.write(
+            f'Проверено новостей: {checked}. {verb} расхождений: {repaired}.'
+        )
+
+    def repair(self, batch, dry_run):
+        """Исправляет счётчики в пачке новостей, возвращает их число."""
+        with transaction.atomic():
+            drifted = list(
+                News.objects.filter(pk__in=batch)
+                .annotate(actual=actual_comment_count())
+                .exclude(comment_count=F('actual'))
+                .values_list('pk', flat=True)
+            )
+            if drifted and not dry_run:
+                News.objects.filter(pk__in=drifted).update(
+                    comment_count=actual_comment_count()
+                )
+                comments_changed(drifted)
+        return len(drifted)
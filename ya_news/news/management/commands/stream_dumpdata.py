@@ -0,0 +1,41 @@
+import sys
+import time
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+
+from yacommon.streaming import dump
+
+DEFAULT_MODELS = ('auth.User', 'news.News', 'news.Comment')
+
+
+class Command(BaseCommand):
+    help = (
+        'Потоково выгружает модели в JSONL, не загружая выборку в память. '
+        f'По умолчанию: {", ".join(DEFAULT_MODELS)}.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('models', nargs='*', metavar='app_label.Model')
+        parser.add_argument(
+            '-o', '--output', help='Файл для выгрузки; по умолчанию stdout.'
+        )
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, models, output, chunk_size, **options):
+        try:
+            models = [
+                apps.get_model(label) for label in models or DEFAULT_MODELS
+            ]
+        except (LookupError, ValueError) as error:
+            raise CommandError(error)
+        started = time.monotonic()
+        if output:
+            with open(output, 'w', encoding='utf-8') as stream:
+                counts = dump(models, stream, chunk_size)
+        else:
+            counts = dump(models, sys.stdout, chunk_size)
+        seconds = time.monotonic() - started
+        for label, count in counts.items():
+            sys.stderr.write(f'{label}: {count}\n')
+        sys.stderr.write(f'Выгрузка заняла {seconds:.1f} с.\n')
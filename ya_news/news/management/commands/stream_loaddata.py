@@ -0,0 +1,47 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+
+from news.search import get_backend
+from yacommon.streaming import iter_records, load
+
+
+class Command(BaseCommand):
+    help = (
+        'Потоково загружает фикстуру (JSONL или JSON-массив) '
+        'пачками через bulk_create.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', help='Путь к файлу или «-» для чтения из stdin.'
+        )
+        parser.add_argument('--chunk-size', type=int, default=2000)
+        parser.add_argument(
+            '--ignore-conflicts', action='store_true',
+            help='Пропускать записи, которые уже есть в базе.',
+        )
+
+    def handle(self, *args, path, chunk_size, ignore_conflicts, **options):
+        started = time.monotonic()
+        if path == '-':
+            counts = load(
+                iter_records(sys.stdin), chunk_size, ignore_conflicts
+            )
+        else:
+            with open(path, encoding='utf-8') as stream:
+                counts = load(
+                    iter_records(stream), chunk_size, ignore_conflicts
+                )
+        if counts['news.News']:
+            # bulk_create не отправляет сигналы, индекс строим заново.
+            get_backend().rebuild()
+        seconds = time.monotonic() - started
+        total = sum(counts.values())
+        for label, count in counts.items():
+            self.stdout.write(f'{label}: {count}')
+        self.stdout.write(
+            f'Загружено объектов: {total} за {seconds:.1f} с '
+            f'({total / seconds if seconds else 0:.0f} объектов/с).'
+        )
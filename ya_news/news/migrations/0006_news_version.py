@@ -0,0 +1,18 @@
+# Generated by Django 3.2.15 on 2026-10-18 18:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0005_comment_created_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='news',
+            name='version',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -0,0 +1,41 @@
+from django.db import migrations
+
+from yacommon.stemmer import stem_text
+
+TABLE = 'news_news_search'
+
+
+def create_index(apps, schema_editor):
+    """Индекс FTS5 нужен только в SQLite, другие базы ищут без него."""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        f'CREATE VIRTUAL TABLE {TABLE} USING fts5('
+        "title, text, tokenize = 'unicode61 remove_diacritics 2')"
+    )
+    News = apps.get_model('news', 'News')
+    rows = [
+        (pk, stem_text(title), stem_text(text))
+        for pk, title, text in News.objects.values_list('pk', 'title', 'text')
+    ]
+    with schema_editor.connection.cursor() as cursor:
+        cursor.executemany(
+            f'INSERT INTO {TABLE} (rowid, title, text) VALUES (%s, %s, %s)',
+            rows,
+        )
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE {TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0007_comment_status'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -2,23 +2,66 @@ from datetime import datetime
 
 from django.conf import settings
 from django.db import models
+from django.db.models import F
+from django.db.models.functions import Greatest
+
+
+class NewsQuerySet(models.QuerySet):
+
+    def change_comment_count(self, delta):
+        """Атомарно сдвигает счётчик комментариев, не уходя ниже нуля."""
+        return self.update(
+            comment_count=Greatest(F('comment_count') + delta, 0)
+        )
+
+    def bump_version(self):
+        """Отмечает, что страница новости изменилась."""
+        return self.update(version=F('version') + 1)
 
 
 class News(models.Model):
     title = models.CharField(max_length=50)
     text = models.TextField()
     date = models.DateField(default=datetime.today)
+    comment_count = models.PositiveIntegerField(default=0, editable=False)
+    version = models.PositiveIntegerField(default=0, editable=False)
+
+    objects = NewsQuerySet.as_manager()
 
     class Meta:
         ordering = ('-date',)
+        indexes = (
+            models.Index(fields=('-date', '-id'), name='news_date_id_idx'),
+        )
         verbose_name_plural = 'Новости'
         verbose_name = 'Новость'
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        """
+        Счётчики меняются запросами UPDATE в обход экземпляра,
+        поэтому при сохранении их значения берутся из базы.
+        Версия растёт и при сохранении отдельных полей.
+        """
+        if self._state.adding:
+            return super().save(*args, **kwargs)
+        self.comment_count = F('comment_count')
+        self.version = F('version') + 1
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'version'}
+        super().save(*args, **kwargs)
+        self.refresh_from_db(fields=('comment_count', 'version'))
+
 
 class Comment(models.Model):
+
+    class Status(models.TextChoices):
+        PUBLISHED = 'published', 'Опубликован'
+        PENDING = 'pending', 'На модерации'
+        REJECTED = 'rejected', 'Отклонён'
+
     news = models.ForeignKey(
         News,
         on_delete=models.CASCADE
@@ -29,9 +72,27 @@ class Comment(models.Model):
     )
     text = models.TextField()
     created = models.DateTimeField(auto_now_add=True)
+    status = models.CharField(
+        max_length=16,
+        choices=Status.choices,
+        default=Status.PUBLISHED,
+    )
 
     class Meta:
         ordering = ('created',)
+        indexes = (
+            # Очередь модерации: в индекс попадают только ожидающие.
+            models.Index(
+                fields=('id',),
+                condition=models.Q(status='pending'),
+                name='comment_pending_idx',
+            ),
+            models.Index(
+                fields=('news', 'created', 'id'),
+                name='comment_news_created_idx',
+            ),
+            models.Index(fields=('created',), name='comment_created_idx'),
+        )
 
     def __str__(self):
         return self.text[:50]
@@ -0,0 +1,198 @@
+"""
+Фоновая модерация комментариев.
+
+При COMMENT_MODERATION = 'async' новый комментарий сохраняется со статусом
+«на модерации», а проверки выполняет пул потоков. Очередью служит сама
+таблица комментариев, внешний брокер не нужен. Пул запускается в процессе
+сайта при первом комментарии (COMMENT_MODERATION_IN_PROCESS) или отдельно
+командой moderate_comments.
+"""
+import logging
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event, Lock, Thread
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils.module_loading import import_string
+
+from .forms import bad_words
+from .models import Comment, News
+from .signals import comments_changed
+
+logger = logging.getLogger(__name__)
+
+
+def is_async():
+    return settings.COMMENT_MODERATION == 'async'
+
+
+def check_bad_words(comments):
+    """Проверка по словарю запрещённых слов."""
+    return [
+        comment.pk for comment in comments if bad_words.search(comment.text)
+    ]
+
+
+def get_checks():
+    return [import_string(path) for path in settings.COMMENT_MODERATION_CHECKS]
+
+
+def pending_ids(limit, exclude=()):
+    return list(
+        Comment.objects.filter(status=Comment.Status.PENDING)
+        .exclude(pk__in=exclude)
+        .order_by('pk')
+        .values_list('pk', flat=True)[:limit]
+    )
+
+
+def moderate(comment_ids):
+    """
+    Проверяет пачку комментариев и публикует одобренные.
+
+    Каждая проверка получает весь список и возвращает id отклонённых.
+    """
+    comments = list(
+        Comment.objects.filter(
+            pk__in=comment_ids, status=Comment.Status.PENDING
+        ).only('id', 'news_id', 'text')
+    )
+    rejected = set()
+    for check in get_checks():
+        rejected.update(check(comments))
+    set_status(
+        [comment for comment in comments if comment.pk not in rejected],
+        Comment.Status.PUBLISHED,
+    )
+    set_status(
+        [comment for comment in comments if comment.pk in rejected],
+        Comment.Status.REJECTED,
+    )
+    return len(comments)
+
+
+def set_status(comments, status):
+    """
+    Переводит комментарии из очереди в status.
+
+    Обновляются только те, что всё ещё на модерации, поэтому повторная
+    обработка той же пачки другим воркером ничего не испортит.
+    """
+    by_news = defaultdict(list)
+    for comment in comments:
+        by_news[comment.news_id].append(comment.pk)
+    with transaction.atomic():
+        for news_id, ids in by_news.items():
+            updated = Comment.objects.filter(
+                pk__in=ids, status=Comment.Status.PENDING
+            ).update(status=status)
+            if updated and status == Comment.Status.PUBLISHED:
+                News.objects.filter(pk=news_id).change_comment_count(updated)
+        if by_news:
+            comments_changed(
+                list(by_news), [comment.pk for comment in comments]
+            )
+
+
+def moderate_pending(batch_size=None):
+    """Синхронно разбирает всю очередь, возвращает число комментариев."""
+    batch_size = batch_size or settings.COMMENT_MODERATION_BATCH_SIZE
+    total = 0
+    while True:
+        batch = pending_ids(batch_size)
+        if not batch:
+            return total
+        total += moderate(batch)
+
+
+class ModerationPool:
+    """
+    Пул потоков, разбирающий очередь модерации пачками.
+
+    Один диспетчер выбирает ожидающие комментарии и раздаёт пачки
+    потокам, не выдавая повторно те, что уже в работе.
+    """
+
+    def __init__(self, workers, batch_size, poll_interval):
+        self.workers = workers
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix='moderation'
+        )
+        self._wakeup = Event()
+        self._stopped = Event()
+        self._lock = Lock()
+        self._in_flight = set()
+        self._dispatcher = Thread(
+            target=self._dispatch, name='moderation-dispatcher', daemon=True
+        )
+
+    def start(self):
+        self._dispatcher.start()
+        return self
+
+    def wake(self):
+        self._wakeup.set()
+
+    def stop(self):
+        self._stopped.set()
+        self._wakeup.set()
+        self._dispatcher.join()
+        self._executor.shutdown(wait=True)
+
+    def _dispatch(self):
+        while not self._stopped.is_set():
+            try:
+                self.dispatch_pending()
+            except Exception:
+                logger.exception('Не удалось выбрать комментарии из очереди')
+            finally:
+                connections.close_all()
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+
+    def dispatch_pending(self):
+        with self._lock:
+            in_flight = set(self._in_flight)
+        ids = pending_ids(self.batch_size * self.workers, exclude=in_flight)
+        for start in range(0, len(ids), self.batch_size):
+            batch = ids[start:start + self.batch_size]
+            with self._lock:
+                self._in_flight.update(batch)
+            self._executor.submit(self._run, batch)
+
+    def _run(self, batch):
+        try:
+            moderate(batch)
+            # В очереди могли остаться комментарии сверх этой пачки.
+            self.wake()
+        except Exception:
+            logger.exception('Ошибка модерации комментариев %s', batch)
+        finally:
+            connections.close_all()
+            with self._lock:
+                self._in_flight.difference_update(batch)
+
+
+_pool = None
+_pool_lock = Lock()
+
+
+def get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ModerationPool(
+                settings.COMMENT_MODERATION_WORKERS,
+                settings.COMMENT_MODERATION_BATCH_SIZE,
+                settings.COMMENT_MODERATION_POLL_INTERVAL,
+            ).start()
+    return _pool
+
+
+def notify():
+    """Сообщает пулу о новых комментариях в очереди."""
+    if settings.COMMENT_MODERATION_IN_PROCESS:
+        get_pool().wake()
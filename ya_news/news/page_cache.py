@@ -0,0 +1,130 @@
+from datetime import datetime, time
+from functools import wraps
+from hashlib import md5
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from .models import Comment, News
+
+GENERATION_KEY = 'news:home:generation'
+
+
+def get_cache():
+    return caches[settings.NEWS_HOME_PAGE_CACHE_ALIAS]
+
+
+def new_generation():
+    """Случайный токен поколения и время сброса в секундах."""
+    return f'{uuid4().hex}-{int(timezone.now().timestamp())}'
+
+
+def purged_at(generation):
+    return int(generation.rsplit('-', 1)[1])
+
+
+def get_generation():
+    """
+    Поколение кэша главной страницы.
+
+    Все ключи страниц включают поколение, поэтому сброс кэша — это
+    запись одного нового значения, а не поиск и удаление всех страниц.
+    """
+    cache = get_cache()
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        cache.add(GENERATION_KEY, new_generation(), None)
+        generation = cache.get(GENERATION_KEY)
+    return generation
+
+
+def purge():
+    """Сбрасывает кэш главной страницы сейчас и после коммита."""
+    def set_generation():
+        get_cache().set(GENERATION_KEY, new_generation(), None)
+    set_generation()
+    transaction.on_commit(set_generation)
+
+
+def get_validators(generation):
+    """Возвращает (ETag, Last-Modified) главной страницы."""
+    key = f'news:home:{generation}:validators'
+    validators = get_cache().get(key)
+    if validators is None:
+        validators = compute_validators(generation)
+        get_cache().set(
+            key, validators, settings.NEWS_HOME_PAGE_CACHE_TIMEOUT
+        )
+    return validators
+
+
+def compute_validators(generation):
+    """
+    Считает валидаторы по самой свежей новости и комментарию.
+
+    Правка или удаление новости не сдвигают эти даты вперёд, поэтому
+    Last-Modified не раньше последнего сброса кэша.
+    """
+    news_date = News.objects.aggregate(last=Max('date'))['last']
+    comment_created = Comment.objects.aggregate(
+        last=Max('created')
+    )['last']
+    moments = [purged_at(generation)]
+    if comment_created:
+        moments.append(comment_created.timestamp())
+    if news_date:
+        moments.append(timezone.make_aware(
+            datetime.combine(news_date, time())
+        ).timestamp())
+    last_modified = max(moments)
+    etag = md5(
+        f'{generation}:{news_date}:{comment_created}'.encode()
+    ).hexdigest()
+    return f'"{etag}"', last_modified
+
+
+def render_cached(request, generation, view_func, *args, **kwargs):
+    """Берёт отрендеренную страницу из кэша или рендерит и сохраняет её."""
+    key = 'news:home:{}:{}'.format(
+        generation, md5(request.get_full_path().encode()).hexdigest()
+    )
+    response = get_cache().get(key)
+    if response is None:
+        response = view_func(request, *args, **kwargs)
+        if response.status_code == 200:
+            if hasattr(response, 'render'):
+                response.render()
+            get_cache().set(
+                key, response, settings.NEWS_HOME_PAGE_CACHE_TIMEOUT
+            )
+    return response
+
+
+def anonymous_page_cache(view_func):
+    """
+    Отдаёт анонимным пользователям страницу из кэша.
+
+    Работает только при NEWS_HOME_PAGE_CACHE = True; авторизованные
+    пользователи всегда получают свежую страницу.
+    """
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        if (not settings.NEWS_HOME_PAGE_CACHE
+                or request.user.is_authenticated):
+            return view_func(request, *args, **kwargs)
+        generation = get_generation()
+        etag, last_modified = get_validators(generation)
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        ) or render_cached(request, generation, view_func, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+    return wrapper
@@ -1,4 +1,10 @@
+from copy import deepcopy
+from datetime import datetime, timedelta
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import override_settings
 from django.urls import reverse
 from news.models import News, Comment
 import pytest
@@ -9,6 +15,54 @@ COMMENTS_COUNT = 3
 SECOND_NEWS_COUNT = 3
 
 
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Кэш живёт дольше тестовой транзакции — очищаем его между тестами."""
+    yield
+    for cache in caches.all():
+        cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def query_budget(settings):
+    """В тестах превышение бюджета запросов и N+1 роняют запрос."""
+    settings.QUERY_BUDGET_RAISE = True
+
+
+@pytest.fixture(scope='session', autouse=True)
+def fast_password_hasher():
+    with override_settings(PASSWORD_HASHERS=settings.TEST_PASSWORD_HASHERS):
+        yield
+
+
+@pytest.fixture(scope='session', autouse=True)
+def snapshot(django_db_setup, django_db_blocker):
+    """
+    Общие данные создаются один раз за сессию, до первого теста.
+
+    Новость и два пользователя снимка видны в каждом тесте. Каждый тест
+    идёт в транзакции, которая откатывается, поэтому снимок
+    восстанавливается без запросов, а фикстуры ниже отдают копии
+    объектов, как setUpTestData в TestCase. Тестам, которые считают
+    строки таблиц, нужна фикстура without_snapshot.
+    """
+    with django_db_blocker.unblock():
+        return {
+            'news': News.objects.create(title='Заголовок', text='Текст'),
+            'author': User.objects.create(username='Автор'),
+            'reader': User.objects.create(username='Читатель простой'),
+        }
+
+
+@pytest.fixture
+def without_snapshot(snapshot):
+    """Удаляет строки снимка; откат транзакции теста вернёт их."""
+    News.objects.filter(pk=snapshot['news'].pk).delete()
+    User.objects.filter(
+        pk__in=(snapshot['author'].pk, snapshot['reader'].pk)
+    ).delete()
+
+
 @pytest.fixture
 def client_loggin(client, author):
     client.force_login(author)
@@ -21,18 +75,18 @@ def form_data():
 
 
 @pytest.fixture
-def news():
-    return News.objects.create(title='Заголовок', text='Текст')
+def news(snapshot):
+    return deepcopy(snapshot['news'])
 
 
 @pytest.fixture
-def author():
-    return User.objects.create(username='Автор')
+def author(snapshot):
+    return deepcopy(snapshot['author'])
 
 
 @pytest.fixture
-def reader():
-    return User.objects.create(username='Читатель простой')
+def reader(snapshot):
+    return deepcopy(snapshot['reader'])
 
 
 @pytest.fixture
@@ -64,6 +118,19 @@ def second_comments(second_news, author):
     ]
 
 
+@pytest.fixture
+def all_news():
+    today = datetime.today()
+    return News.objects.bulk_create(
+        News(
+            title=f'Новость {index}',
+            text='Просто текст.',
+            date=today - timedelta(days=index // 2),
+        )
+        for index in range(NEWS_COUNT)
+    )
+
+
 @pytest.fixture
 def home_url():
     return reverse('news:home')
@@ -1,8 +1,17 @@
-from django.urls import reverse
+from http import HTTPStatus
+from unittest import mock
+
+from django.template import engines
+from django.urls import URLResolver, reverse
 import pytest
-from news.models import News
+from yacommon.instrumentation import metrics
+from news import page_cache
+from news.models import Comment, News
+from yacommon.template_cache import warm
 
 MAX_NEWS_ON_PAGE = 10
+COUNT = 42
+COMMENTS_ON_PAGE = 2
 
 
 @pytest.mark.django_db
@@ -26,6 +35,19 @@ def test_news_order_on_home_page(client, home_url):
     assert list(news_list) == expected_news_list
 
 
+@pytest.mark.django_db
+def test_comment_count_on_home_page(client, home_url, second_news,
+                                    django_assert_num_queries):
+    """
+    Главная страница читает счётчик комментариев из таблицы новостей
+    и не обращается к самим комментариям.
+    """
+    News.objects.filter(pk=second_news[0].pk).update(comment_count=COUNT)
+    with django_assert_num_queries(1):
+        response = client.get(home_url)
+    assert f'Комментариев: {COUNT}' in response.content.decode()
+
+
 @pytest.mark.django_db
 def test_comments_order_on_news_page(client, second_news, second_comments):
     """Комментарии на странице отдельной новости отсортированы:
@@ -36,6 +58,33 @@ def test_comments_order_on_news_page(client, second_news, second_comments):
     assert list(comments_list) == second_comments
 
 
+@pytest.mark.django_db
+def test_comments_are_paginated_on_news_page(client, settings, second_news,
+                                             second_comments):
+    """
+    На странице новости выводится первая порция комментариев,
+    остальные отдаются по курсору в виде фрагмента или JSON.
+    """
+    settings.COMMENTS_COUNT_ON_NEWS_PAGE = COMMENTS_ON_PAGE
+    news_id = second_news[0].id
+    first_page = client.get(
+        reverse('news:detail', args=(news_id,))
+    ).context['comments']
+    assert list(first_page) == second_comments[:COMMENTS_ON_PAGE]
+    comments_url = reverse('news:comments', args=(news_id,))
+    fragment = client.get(comments_url, {'cursor': first_page.next_cursor})
+    assert list(fragment.context['comments']) == (
+        second_comments[COMMENTS_ON_PAGE:]
+    )
+    data = client.get(
+        comments_url, {'cursor': first_page.next_cursor, 'format': 'json'}
+    ).json()
+    assert [item['id'] for item in data['comments']] == [
+        comment.id for comment in second_comments[COMMENTS_ON_PAGE:]
+    ]
+    assert data['next_cursor'] is None
+
+
 @pytest.mark.django_db
 @pytest.mark.parametrize('is_authenticated,form_is_available', [
     (False, False),
@@ -51,3 +100,214 @@ def test_comment_form_availability(client, reader,
         client.force_login(reader)
     response = client.get(url)
     assert ('form' in response.context) == form_is_available
+
+
+@pytest.mark.django_db
+def test_home_page_cursor_pagination(client, home_url, all_news):
+    """
+    Курсор «Старее» ведёт к следующей порции новостей без повторов,
+    а курсор «Новее» возвращает к предыдущей странице.
+    """
+    expected_news_list = list(News.objects.order_by('-date', '-id'))
+    first_page = client.get(home_url).context['page_obj']
+    second_page = client.get(
+        home_url, {'cursor': first_page.next_cursor}
+    ).context['page_obj']
+    assert len(first_page) == MAX_NEWS_ON_PAGE
+    assert list(first_page) + list(second_page) == expected_news_list
+    assert not second_page.has_next()
+    back_page = client.get(
+        home_url, {'cursor': second_page.previous_cursor}
+    ).context['page_obj']
+    assert list(back_page) == list(first_page)
+    assert not back_page.has_previous()
+
+
+@pytest.mark.django_db
+def test_news_card_fragment_is_invalidated(client, home_url, news):
+    """
+    Карточка новости отдаётся из кэша фрагментов,
+    пока новость не сохранят заново.
+    """
+    client.get(home_url)
+    News.objects.filter(pk=news.pk).update(title='Без сигнала')
+    assert 'Без сигнала' not in client.get(home_url).content.decode()
+    news.title = 'Новый заголовок'
+    news.save()
+    assert 'Новый заголовок' in client.get(home_url).content.decode()
+
+
+@pytest.mark.django_db
+def test_comment_fragment_is_invalidated(client, news_detail_url, comment):
+    """Блок комментария сбрасывается из кэша при изменении комментария."""
+    client.get(news_detail_url)
+    Comment.objects.filter(pk=comment.pk).update(text='Без сигнала')
+    assert 'Без сигнала' not in client.get(news_detail_url).content.decode()
+    comment.text = 'Исправленный текст'
+    comment.save()
+    assert 'Исправленный текст' in (
+        client.get(news_detail_url).content.decode()
+    )
+
+
+@pytest.mark.django_db
+def test_home_page_cache_for_anonymous(client, settings, home_url, news,
+                                       author, django_assert_num_queries):
+    """
+    Анонимы получают главную из кэша с валидаторами и 304,
+    кэш сбрасывается при изменении новостей.
+    """
+    settings.NEWS_HOME_PAGE_CACHE = True
+    response = client.get(home_url)
+    with django_assert_num_queries(0):
+        cached = client.get(home_url)
+    assert cached.content == response.content
+    assert client.get(
+        home_url, HTTP_IF_NONE_MATCH=response['ETag']
+    ).status_code == HTTPStatus.NOT_MODIFIED
+    news.title = 'Новый заголовок'
+    news.save()
+    assert 'Новый заголовок' in client.get(home_url).content.decode()
+    client.force_login(author)
+    with django_assert_num_queries(3):
+        client.get(home_url)
+
+
+@pytest.mark.django_db
+def test_home_page_last_modified_follows_news_edit(client, settings,
+                                                   home_url, news):
+    """
+    Правка заголовка не сдвигает даты новостей и комментариев,
+    но If-Modified-Since после неё получает свежую страницу.
+    """
+    settings.NEWS_HOME_PAGE_CACHE = True
+    # Кэш сброшен давно: Last-Modified — по дате новости.
+    page_cache.get_cache().set(page_cache.GENERATION_KEY, 'old-0', None)
+    last_modified = client.get(home_url)['Last-Modified']
+    assert client.get(
+        home_url, HTTP_IF_MODIFIED_SINCE=last_modified
+    ).status_code == HTTPStatus.NOT_MODIFIED
+    news.title = 'Новый заголовок'
+    news.save()
+    response = client.get(home_url, HTTP_IF_MODIFIED_SINCE=last_modified)
+    assert response.status_code == HTTPStatus.OK
+    assert 'Новый заголовок' in response.content.decode()
+
+
+@pytest.mark.django_db
+def test_news_detail_not_modified(client_loggin, news_detail_url, form_data):
+    """
+    Неизменившаяся страница новости отвечает 304,
+    новый комментарий меняет ETag.
+    """
+    # Первый ответ выставляет CSRF-cookie, она входит в ETag.
+    client_loggin.get(news_detail_url)
+    etag = client_loggin.get(news_detail_url)['ETag']
+    response = client_loggin.get(news_detail_url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    client_loggin.post(news_detail_url, data=form_data)
+    response = client_loggin.get(news_detail_url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+
+
+@pytest.mark.django_db
+def test_news_detail_etag_changes_on_partial_save(client, news_detail_url,
+                                                  news):
+    """save(update_fields=...) тоже меняет ETag страницы новости."""
+    etag = client.get(news_detail_url)['ETag']
+    news.title = 'Новый заголовок'
+    news.save(update_fields=['title'])
+    response = client.get(news_detail_url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+    assert 'Новый заголовок' in response.content.decode()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('sync_name,async_name', [
+    ('news:home', 'news:home_async'),
+    ('news:detail', 'news:detail_async'),
+    ('news:comments', 'news:comments_async'),
+])
+def test_async_pages_match_sync(client, news, comment,
+                                sync_name, async_name):
+    """Асинхронные варианты страниц отдают то же, что синхронные."""
+    args = () if sync_name == 'news:home' else (news.pk,)
+    sync_response = client.get(reverse(sync_name, args=args))
+    async_response = client.get(reverse(async_name, args=args))
+    assert async_response.status_code == HTTPStatus.OK
+    assert async_response.content == sync_response.content
+
+
+@pytest.mark.django_db
+def test_async_news_detail_not_modified(client, news):
+    """Асинхронная страница новости тоже отвечает 304 по ETag."""
+    url = reverse('news:detail_async', args=(news.pk,))
+    etag = client.get(url)['ETag']
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+
+@pytest.mark.django_db
+def test_request_timing(client, settings, news_detail_url, news):
+    """Замеряемый запрос получает Server-Timing и попадает в /metrics/."""
+    metrics.reset()
+    assert 'Server-Timing' not in client.get(news_detail_url)
+    settings.REQUEST_TIMING_SAMPLE_RATE = 1
+    server_timing = client.get(news_detail_url)['Server-Timing']
+    for phase in ('resolve', 'auth', 'db', 'render', 'total'):
+        assert f'{phase};dur=' in server_timing
+    settings.REQUEST_TIMING_SAMPLE_RATE = 0
+    metrics_url = reverse('news:metrics')
+    assert client.get(metrics_url).status_code == HTTPStatus.FORBIDDEN
+    settings.METRICS_ALLOWED_IPS = ['127.0.0.1']
+    text = client.get(metrics_url).content.decode()
+    assert (
+        'yanews_request_phase_seconds_count{view="news:detail",phase="db"} 1'
+        in text
+    )
+
+
+@pytest.mark.django_db
+def test_request_timing_resolves_url_once(client, settings, news_detail_url,
+                                          news):
+    """Фаза resolve берёт маршрут из обработчика, а не разбирает URL снова."""
+    settings.REQUEST_TIMING_SAMPLE_RATE = 1
+    with mock.patch('django.urls.resolvers.URLResolver.resolve',
+                    autospec=True,
+                    side_effect=URLResolver.resolve) as resolve:
+        response = client.get(news_detail_url)
+    assert 'resolve;dur=' in response['Server-Timing']
+    paths = [call.args[1] for call in resolve.call_args_list]
+    assert paths.count(news_detail_url) == 1
+
+
+def test_templates_are_warmed_in_cached_loader(settings):
+    """Кэширующий загрузчик получает все шаблоны проекта при прогреве."""
+    settings.TEMPLATES = [{
+        **settings.TEMPLATES[0],
+        'APP_DIRS': False,
+        'OPTIONS': {**settings.TEMPLATES[0]['OPTIONS'], 'loaders': [
+            ('django.template.loaders.cached.Loader', [
+                'django.template.loaders.filesystem.Loader',
+                'django.template.loaders.app_directories.Loader',
+            ]),
+        ]},
+    }]
+    assert warm() == []
+    loader = engines['django'].engine.template_loaders[0]
+    assert {'base.html', 'includes/header.html', 'news/detail.html'} <= set(
+        loader.get_template_cache
+    )
+
+
+def test_missing_template_is_reported(settings, tmp_path):
+    """Подключение несуществующего шаблона находится до первого запроса."""
+    (tmp_path / 'broken.html').write_text(
+        '{% extends "base.html" %}{% block content %}'
+        '{% include "includes/missing.html" %}{% endblock %}'
+    )
+    settings.TEMPLATES = [{
+        **settings.TEMPLATES[0],
+        'DIRS': [*settings.TEMPLATES[0]['DIRS'], tmp_path],
+    }]
+    assert warm() == ['broken.html: не найден шаблон includes/missing.html']
@@ -1,6 +1,24 @@
+import json
+import os
+from datetime import timedelta
+from io import StringIO
+
 import pytest
+from django.contrib.auth.models import Group, Permission, User
+from django.core.management import CommandError, call_command
+from django.db import connection, connections
+from django.http import HttpResponse
 from django.urls import reverse
-from news.models import Comment
+from django.utils import timezone
+from news.models import Comment, News
+from yacommon.routers import (PIN_COOKIE, PrimaryPinMiddleware,
+                              PrimaryReplicaRouter)
+from yacommon.signals import set_sqlite_pragmas
+from news import moderation
+from news.ingest import ingest_comments
+from news.moderation import moderate_pending
+from yacommon import instrumentation, query_budget
+from yacommon.query_budget import QueryBudgetExceeded, check
 from news.forms import BAD_WORDS, WARNING
 from http import HTTPStatus
 
@@ -29,6 +47,8 @@ def test_user_can_create_comment(client_loggin,
     assert comment.text == form_data['text']
     assert comment.news == news
     assert comment.author == author
+    news.refresh_from_db()
+    assert news.comment_count == 1
 
 
 @pytest.mark.django_db
@@ -43,6 +63,54 @@ def test_user_cant_use_bad_words(client_loggin, news_detail_url):
     assert Comment.objects.count() == 0
 
 
+@pytest.mark.django_db
+@pytest.mark.parametrize('text', (
+    'РЕДИСКА ты!',
+    'Все они редисками оказались',
+    'Ну и НЕГОДЯЙ',
+))
+def test_bad_words_ignore_case_and_word_forms(client_loggin,
+                                              news_detail_url, text):
+    """Запрещённые слова находятся в любом регистре и в других формах."""
+    response = client_loggin.post(news_detail_url, data={'text': text})
+    assert response.context['form'].errors['text'] == [WARNING]
+
+
+@pytest.mark.django_db
+def test_bad_words_file_is_reloaded(client_loggin, news_detail_url,
+                                    settings, tmp_path):
+    """Словарь из BAD_WORDS_FILE подхватывается после изменения файла."""
+    words_file = tmp_path / 'bad_words.txt'
+    words_file.write_text('# словарь\nзлыдень\n', encoding='utf-8')
+    settings.BAD_WORDS_FILE = str(words_file)
+    form_data = {'text': 'Ты злыдень и зануда'}
+    response = client_loggin.post(news_detail_url, data=form_data)
+    assert response.context['form'].errors['text'] == [WARNING]
+    words_file.write_text('зануда\n', encoding='utf-8')
+    mtime_ns = words_file.stat().st_mtime_ns + 10 ** 9
+    os.utime(words_file, ns=(mtime_ns, mtime_ns))
+    response = client_loggin.post(news_detail_url, data={'text': 'Злыдень'})
+    assert response.status_code == 302
+    response = client_loggin.post(news_detail_url, data=form_data)
+    assert response.context['form'].errors['text'] == [WARNING]
+
+
+@pytest.mark.django_db
+def test_missing_bad_words_file_keeps_last_filter(
+        client_loggin, news_detail_url, settings, tmp_path, caplog):
+    """Пропавший на время файл словаря не роняет отправку комментариев."""
+    words_file = tmp_path / 'bad_words.txt'
+    words_file.write_text('злыдень\n', encoding='utf-8')
+    settings.BAD_WORDS_FILE = str(words_file)
+    form_data = {'text': 'Ты злыдень'}
+    response = client_loggin.post(news_detail_url, data=form_data)
+    assert response.context['form'].errors['text'] == [WARNING]
+    words_file.unlink()
+    response = client_loggin.post(news_detail_url, data=form_data)
+    assert response.context['form'].errors['text'] == [WARNING]
+    assert 'Не удалось прочитать BAD_WORDS_FILE' in caplog.text
+
+
 @pytest.mark.django_db
 @pytest.mark.parametrize('url_name,method',
                          [('news:edit', 'post'), ('news:delete', 'delete')])
@@ -76,3 +144,321 @@ def test_user_cant_edit_or_delete_comment_of_another_user(client, comment,
     assert response.status_code == HTTPStatus.NOT_FOUND
     comment.refresh_from_db()
     assert comment.text != form_data['text']
+
+
+@pytest.mark.django_db
+def test_comment_count_follows_delete(client_loggin, news, comment):
+    """Удаление комментария уменьшает счётчик у новости."""
+    News.objects.filter(pk=news.pk).update(comment_count=1)
+    client_loggin.delete(reverse('news:delete', args=(comment.id,)))
+    news.refresh_from_db()
+    assert news.comment_count == 0
+
+
+@pytest.mark.django_db
+def test_recount_comments_repairs_drift(news, second_news, second_comments):
+    """Команда recount_comments исправляет разошедшиеся счётчики."""
+    News.objects.filter(pk=news.pk).update(comment_count=5)
+    call_command('recount_comments', batch_size=2)
+    assert dict(News.objects.values_list('pk', 'comment_count')) == {
+        news.pk: 0,
+        second_news[0].pk: len(second_comments),
+        second_news[1].pk: 0,
+        second_news[2].pk: 0,
+    }
+
+
+@pytest.mark.django_db
+def test_async_moderation_publishes_clean_comments(client_loggin, settings,
+                                                   news_detail_url, news):
+    """
+    При фоновой модерации комментарий сначала ждёт проверки,
+    затем чистый публикуется, а с запрещённым словом отклоняется.
+    """
+    settings.COMMENT_MODERATION = 'async'
+    settings.COMMENT_MODERATION_IN_PROCESS = False
+    for text in ('Хорошая новость', f'Автор — {BAD_WORDS[0]}'):
+        response = client_loggin.post(news_detail_url, data={'text': text})
+        assert response.status_code == 302
+    assert set(Comment.objects.values_list('status', flat=True)) == {
+        Comment.Status.PENDING
+    }
+    assert not client_loggin.get(news_detail_url).context['comments']
+    assert moderate_pending() == 2
+    assert dict(Comment.objects.values_list('text', 'status')) == {
+        'Хорошая новость': Comment.Status.PUBLISHED,
+        f'Автор — {BAD_WORDS[0]}': Comment.Status.REJECTED,
+    }
+    news.refresh_from_db()
+    assert news.comment_count == 1
+
+
+@pytest.mark.django_db
+def test_bulk_comment_import(client_loggin, author, news):
+    """
+    Пакетная загрузка сохраняет годные записи и отчитывается
+    об отклонённых.
+    """
+    author.user_permissions.add(
+        Permission.objects.get(codename='add_comment')
+    )
+    records = [
+        {'news': news.id, 'author': author.username, 'text': 'Первый'},
+        {'news': news.id, 'author': author.username, 'text': BAD_WORDS[0]},
+        {'news': news.id + 1, 'author': author.username, 'text': 'Нет'},
+        {'news': news.id, 'author': 'Незнакомец', 'text': 'Нет автора'},
+        {'news': news.id, 'author': author.username, 'text': 'Второй'},
+    ]
+    body = '\n'.join(json.dumps(record) for record in records) + '\nмусор'
+    response = client_loggin.post(
+        reverse('news:import_comments') + '?chunk_size=2',
+        data=body.encode(),
+        content_type='application/x-ndjson',
+    )
+    report = response.json()
+    assert report['created'] == 2
+    assert [reject['line'] for reject in report['rejects']] == [2, 3, 4, 6]
+    assert list(Comment.objects.values_list('text', flat=True)) == [
+        'Первый', 'Второй'
+    ]
+    news.refresh_from_db()
+    assert news.comment_count == 2
+
+
+@pytest.mark.django_db
+def test_bulk_comment_import_wakes_moderation(
+        author, news, settings, django_capture_on_commit_callbacks):
+    """При фоновой модерации загруженные комментарии будят пул."""
+    settings.COMMENT_MODERATION = 'async'
+    record = {'news': news.id, 'author': author.username, 'text': 'Текст'}
+    with django_capture_on_commit_callbacks() as callbacks:
+        ingest_comments([record])
+    assert Comment.objects.get().status == Comment.Status.PENDING
+    assert moderation.notify in callbacks
+
+
+@pytest.mark.django_db
+def test_import_comments_command(author, news, tmp_path):
+    """Команда import_comments загружает комментарии из CSV."""
+    path = tmp_path / 'comments.csv'
+    path.write_text(
+        f'news,author,text\n{news.id},{author.username},Из архива\n',
+        encoding='utf-8',
+    )
+    call_command('import_comments', str(path))
+    assert Comment.objects.get().text == 'Из архива'
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('chunk_size', ('0', '-1', 'abc'))
+def test_bulk_comment_import_rejects_bad_chunk_size(
+        client_loggin, author, news, chunk_size):
+    """Размер пачки меньше 1 отклоняется, а не теряет записи."""
+    author.user_permissions.add(
+        Permission.objects.get(codename='add_comment')
+    )
+    record = {'news': news.id, 'author': author.username, 'text': 'Текст'}
+    response = client_loggin.post(
+        reverse('news:import_comments') + f'?chunk_size={chunk_size}',
+        data=json.dumps(record).encode(),
+        content_type='application/x-ndjson',
+    )
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    with pytest.raises(CommandError):
+        call_command('import_comments', '-', chunk_size=0)
+    assert Comment.objects.count() == 0
+
+
+@pytest.mark.django_db
+def test_bulk_comment_import_requires_permission(client_loggin):
+    """Без права на добавление комментариев загрузка запрещена."""
+    response = client_loggin.post(
+        reverse('news:import_comments'),
+        data=b'{}',
+        content_type='application/x-ndjson',
+    )
+    assert response.status_code == HTTPStatus.FORBIDDEN
+    assert Comment.objects.count() == 0
+
+
+@pytest.mark.django_db
+def test_stream_dump_and_load_roundtrip(news, comment, tmp_path):
+    """Потоковая выгрузка и загрузка сохраняют данные и даты создания."""
+    path = tmp_path / 'dump.jsonl'
+    call_command('stream_dumpdata', output=str(path), chunk_size=1)
+    created = comment.created
+    Comment.objects.all().delete()
+    News.objects.all().delete()
+    call_command('stream_loaddata', str(path), chunk_size=1,
+                 ignore_conflicts=True)
+    loaded = Comment.objects.get()
+    assert (loaded.pk, loaded.news_id, loaded.created) == (
+        comment.pk, news.pk, created
+    )
+
+
+@pytest.mark.django_db
+def test_stream_load_restores_groups_and_permissions(author, tmp_path):
+    """Группы и права пользователя переживают выгрузку и загрузку."""
+    permission = Permission.objects.get(codename='add_comment')
+    group = Group.objects.create(name='Модераторы')
+    author.groups.add(group)
+    author.user_permissions.add(permission)
+    path = tmp_path / 'dump.jsonl'
+    call_command('stream_dumpdata', 'auth.User', output=str(path))
+    User.objects.filter(pk=author.pk).delete()
+    call_command('stream_loaddata', str(path), ignore_conflicts=True)
+    loaded = User.objects.get(pk=author.pk)
+    assert list(loaded.groups.all()) == [group]
+    assert list(loaded.user_permissions.all()) == [permission]
+
+
+@pytest.mark.django_db
+def test_generate_data_is_reproducible():
+    """Синтетические данные зависят от seed, но не от числа процессов."""
+    options = {'users': 5, 'news': 20, 'comments': 300, 'chunk_size': 50}
+    generated = []
+    for processes in (2, 1):
+        for model in (Comment, News, User):
+            model.objects.all().delete()
+        call_command('generate_data', processes=processes, stdout=StringIO(),
+                     **options)
+        generated.append((
+            list(News.objects.values_list('id', 'title', 'comment_count')),
+            list(Comment.objects.values_list('news', 'author', 'text')),
+        ))
+    assert generated[0] == generated[1]
+    news, comments = generated[0]
+    counts = [comment_count for _, _, comment_count in news]
+    assert len(comments) == sum(counts) == options['comments']
+    # Закон Ципфа: самая обсуждаемая новость намного популярнее средней.
+    assert max(counts) > 3 * options['comments'] / options['news']
+
+
+@pytest.mark.django_db
+def test_generated_comments_follow_their_news():
+    """Комментарий создан после выхода новости и не позже генерации."""
+    call_command('generate_data', processes=1, stdout=StringIO(),
+                 users=5, news=20, comments=200, days=30)
+    now = timezone.now()
+    comments = Comment.objects.values_list('created', 'news__date')
+    assert min(created for created, _ in comments) < now - timedelta(days=1)
+    for created, news_date in comments:
+        assert timezone.localdate(created) >= news_date
+        assert created <= now
+
+
+@pytest.mark.usefixtures('without_snapshot')
+@pytest.mark.django_db
+def test_stream_loaddata_reads_json_fixture():
+    """Загрузчик понимает и обычную фикстуру-массив."""
+    path = 'news/fixtures/news.json'
+    with open(path, encoding='utf-8') as fixture:
+        titles = [item['fields']['title'] for item in json.load(fixture)]
+    call_command('stream_loaddata', path)
+    assert sorted(News.objects.values_list('title', flat=True)) == sorted(
+        titles
+    )
+
+
+@pytest.mark.django_db
+def test_search_index_follows_news_changes(client):
+    """Поиск находит формы слова и следует за изменениями новости."""
+    url = reverse('news:search')
+    found_news = News.objects.create(title='Редиска', text='Выросла большая')
+    News.objects.create(title='Огурцы', text='Зелёные')
+    response = client.get(url, {'q': 'редиской'})
+    assert list(response.context['news_list']) == [found_news]
+    found_news.title = 'Морковь'
+    found_news.save()
+    assert not client.get(url, {'q': 'редиска'}).context['news_list']
+    found_news.delete()
+    assert not client.get(url, {'q': 'морковь'}).context['news_list']
+
+
+@pytest.mark.django_db
+def test_search_simple_backend(client, settings):
+    """Запасной бэкенд находит те же новости без индекса."""
+    settings.NEWS_SEARCH_BACKEND = 'yacommon.search.SimpleBackend'
+    # В SQLite icontains не учитывает регистр только для латиницы.
+    found_news = News.objects.create(title='Главное',
+                                     text='новости про редиску')
+    response = client.get(reverse('news:search'), {'q': 'Редиска новость'})
+    assert list(response.context['news_list']) == [found_news]
+
+
+def test_reads_stick_to_primary_after_write(rf, settings):
+    """После POST чтение идёт из основной базы, пока жив cookie."""
+    settings.DATABASE_REPLICAS = ['replica_1']
+    router = PrimaryReplicaRouter()
+    read_from = []
+
+    def view(request):
+        read_from.append(router.db_for_read(News))
+        return HttpResponse()
+
+    middleware = PrimaryPinMiddleware(view)
+    middleware(rf.get('/'))
+    response = middleware(rf.post('/'))
+    pinned_request = rf.get('/')
+    pinned_request.COOKIES[PIN_COOKIE] = response.cookies[PIN_COOKIE].value
+    middleware(pinned_request)
+    assert read_from == ['replica_1', 'default', 'default']
+    assert response.cookies[PIN_COOKIE]['max-age'] == (
+        settings.DATABASE_PRIMARY_PIN_SECONDS
+    )
+    assert router.db_for_write(News) == 'default'
+    # Вне запроса (команды, потоки модерации) — только основная база.
+    assert router.db_for_read(News) == 'default'
+
+
+@pytest.mark.django_db
+def test_sqlite_pragmas_applied_to_connection(settings):
+    """PRAGMA из SQLITE_PRAGMAS выполняются для нового соединения."""
+    settings.SQLITE_PRAGMAS = {'cache_size': -1234}
+    set_sqlite_pragmas(sender=None, connection=connection)
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA cache_size')
+        assert cursor.fetchone()[0] == -1234
+
+
+@pytest.mark.django_db
+def test_query_budget_is_enforced(client, settings, home_url, news, caplog):
+    """Лишние запросы роняют тест, а в продакшене пишутся в журнал."""
+    settings.QUERY_BUDGETS = {'news:home': 0}
+    with pytest.raises(QueryBudgetExceeded):
+        client.get(home_url)
+    settings.QUERY_BUDGET_RAISE = False
+    assert client.get(home_url).status_code == HTTPStatus.OK
+    assert 'news:home: 1 запросов при бюджете 0' in caplog.text
+
+
+def test_repeated_query_shape_is_n_plus_one(settings):
+    """Один и тот же запрос для каждой новости считается N+1."""
+    settings.QUERY_BUDGETS = {}
+    sql = 'SELECT COUNT(*) FROM "news_comment" WHERE "news_id" = %s'
+    queries = [sql] * (settings.QUERY_REPEAT_LIMIT + 1)
+    assert check('news:home', queries[:-1]) == []
+    assert check('news:home', queries) == [
+        f'N+1: {len(queries)} раз {sql}'
+    ]
+
+
+@pytest.mark.django_db
+def test_connection_wrappers_survive_caller_execute_wrapper():
+    """
+    Соединение, открытое внутри execute_wrapper(), после выхода из него
+    сохраняет обёртки проекта, а обёртка вызывающего снимается.
+    """
+    def caller_wrapper(execute, sql, params, many, context):
+        return execute(sql, params, many, context)
+
+    new_connection = connections.create_connection('default')
+    try:
+        with new_connection.execute_wrapper(caller_wrapper):
+            new_connection.ensure_connection()
+        assert new_connection.execute_wrappers == [
+            instrumentation.record_query, query_budget.record_query
+        ]
+    finally:
+        new_connection.close()
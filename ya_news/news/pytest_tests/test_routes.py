@@ -18,6 +18,13 @@ def test_pages_availability(client, name):
     assert response.status_code == HTTPStatus.OK
 
 
+@pytest.mark.django_db
+def test_home_page_with_invalid_cursor(client, home_url):
+    """Некорректный курсор пагинации приводит к ошибке 404."""
+    response = client.get(home_url, {'cursor': 'не-курсор'})
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
 @pytest.mark.django_db
 def test_news_page_available_for_anonymous_user(client, news):
     """
@@ -29,6 +36,23 @@ def test_news_page_available_for_anonymous_user(client, news):
     assert response.status_code == HTTPStatus.OK
 
 
+@pytest.mark.django_db
+def test_comments_fragment_available_for_anonymous_user(client, news):
+    """Порция комментариев к новости доступна анонимному пользователю."""
+    url = reverse('news:comments', args=(news.id,))
+    response = client.get(url)
+    assert response.status_code == HTTPStatus.OK
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('name', ('news:comments', 'news:comments_async'))
+@pytest.mark.parametrize('params', ({}, {'format': 'json'}))
+def test_comments_of_missing_news_not_found(client, name, params):
+    """Комментарии к несуществующей новости — 404, а не пустая порция."""
+    url = reverse(name, args=(10 ** 9,))
+    assert client.get(url, params).status_code == HTTPStatus.NOT_FOUND
+
+
 @pytest.mark.django_db
 @pytest.mark.parametrize(
     'name',
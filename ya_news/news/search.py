@@ -0,0 +1,16 @@
+"""
+Полнотекстовый поиск по новостям.
+
+Бэкенд из yacommon.search выбирается настройкой NEWS_SEARCH_BACKEND;
+индекс обновляется обработчиками сигналов в signals.py.
+"""
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from .models import News
+
+
+def get_backend():
+    return import_string(settings.NEWS_SEARCH_BACKEND)(
+        News, ('title', 'text'), weights=(2.0, 1.0)
+    )
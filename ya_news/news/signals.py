@@ -0,0 +1,45 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import fragments, page_cache, search
+from .models import Comment, News
+
+SEARCH_FIELDS = {'title', 'text'}
+
+
+def comments_changed(news_ids, comment_ids=()):
+    """
+    Сбрасывает всё, что выводит комментарии.
+
+    Вызывается из обработчиков сигналов и явно — после массовых UPDATE
+    и bulk_create, которые сигналов не отправляют.
+    """
+    for pk in comment_ids:
+        fragments.invalidate_comment(pk)
+    fragments.invalidate_news(*news_ids)
+    page_cache.purge()
+    News.objects.filter(pk__in=news_ids).bump_version()
+
+
+@receiver((post_save, post_delete), sender=News)
+def news_changed(sender, instance, **kwargs):
+    fragments.invalidate_news(instance.pk)
+    page_cache.purge()
+
+
+@receiver(post_save, sender=News)
+def index_news(sender, instance, update_fields=None, **kwargs):
+    """Переиндексирует новость, если изменились поля для поиска."""
+    if update_fields is None or SEARCH_FIELDS & set(update_fields):
+        search.get_backend().index(instance)
+
+
+@receiver(post_delete, sender=News)
+def unindex_news(sender, instance, **kwargs):
+    search.get_backend().remove(instance.pk)
+
+
+@receiver((post_save, post_delete), sender=Comment)
+def comment_changed(sender, instance, **kwargs):
+    """В карточке новости выводится число комментариев — сбрасываем и её."""
+    comments_changed((instance.news_id,), (instance.pk,))
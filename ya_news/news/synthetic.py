@@ -0,0 +1,107 @@
+"""
+Синтетические новости и комментарии для проверки на больших объёмах.
+
+Комментарии распределены по новостям и авторам по закону Ципфа.
+Каждый комментарий создан после выхода своей новости, но не позже
+момента запуска генерации. Общая часть — в yacommon.synthetic;
+модуль не обращается к Django, чтобы работать и при запуске
+процессов через spawn.
+"""
+import random
+from bisect import bisect_right
+from datetime import timedelta
+from itertools import accumulate
+
+from yacommon import synthetic
+from yacommon.synthetic import current_plan
+
+WORDS = (
+    'время', 'город', 'жизнь', 'новость', 'работа', 'страна', 'человек',
+    'решение', 'вопрос', 'проект', 'место', 'область', 'система', 'закон',
+    'школа', 'дорога', 'погода', 'неделя', 'рынок', 'цена', 'компания',
+    'власть', 'совет', 'матч', 'команда', 'сезон', 'театр', 'выставка',
+    'музей', 'парк', 'мост', 'река', 'поезд', 'урожай', 'редиска',
+    'огурец', 'праздник', 'концерт', 'фестиваль', 'улица', 'площадь',
+    'больница', 'врач', 'учитель', 'студент', 'экзамен', 'книга',
+    'фильм', 'песня', 'завод', 'строительство', 'ремонт', 'автобус',
+    'метро', 'двор', 'дом', 'соседи', 'жители', 'мэр', 'депутат',
+    'новый', 'большой', 'главный', 'городской', 'местный', 'важный',
+    'последний', 'первый', 'хороший', 'старый', 'летний', 'зимний',
+    'вчера', 'сегодня', 'завтра', 'снова', 'впервые', 'наконец',
+    'открыли', 'построили', 'обсудили', 'решили', 'запустили',
+    'перенесли', 'выиграли', 'показали', 'объявили', 'готовят',
+    'рассказали', 'проверили', 'закрыли', 'отремонтировали',
+    'в', 'на', 'и', 'по', 'для', 'после', 'из-за', 'около', 'без',
+)
+
+
+class Plan(synthetic.Plan):
+    """Размеры и распределения новостей и комментариев."""
+
+    def __init__(self, seed, users, news, comments, exponent, days, now,
+                 user_offset, news_offset, comment_offset):
+        super().__init__(seed, users, user_offset)
+        self.news = news
+        self.comments = comments
+        self.now = now
+        self.news_offset = news_offset
+        self.comment_offset = comment_offset
+        rng = random.Random(f'{seed}-news-ages')
+        # Сколько дней назад вышла новость: нужно и новостям,
+        # и комментариям к ним в других порциях.
+        self.news_ages = [rng.randrange(days) for _ in range(news)]
+        self.comment_counts = synthetic.zipf_counts(
+            comments, synthetic.zipf_weights(news, exponent, seed, 'news')
+        )
+        self.comment_bounds = list(accumulate(self.comment_counts))
+        self.author_weights = list(accumulate(
+            synthetic.zipf_weights(users, exponent, seed, 'authors')
+        ))
+
+    def published(self, index):
+        """Начало дня выхода новости с номером index."""
+        midnight = self.now - timedelta(
+            hours=self.now.hour, minutes=self.now.minute,
+            seconds=self.now.second, microseconds=self.now.microsecond,
+        )
+        return midnight - timedelta(days=self.news_ages[index])
+
+
+def make_news(bounds):
+    """Новости: (id, title, text, date, comment_count)."""
+    start, end = bounds
+    plan = current_plan()
+    rng = plan.rng('news', start)
+    return [
+        (
+            plan.news_offset + index,
+            synthetic.title(rng, WORDS, 50),
+            synthetic.paragraph(rng, WORDS, 2, 6),
+            plan.published(index).date(),
+            plan.comment_counts[index],
+        )
+        for index in range(start, end)
+    ]
+
+
+def make_comments(bounds):
+    """Комментарии: (id, news_id, author_id, text, created)."""
+    start, end = bounds
+    plan = current_plan()
+    rng = plan.rng('comments', start)
+    authors = range(plan.user_offset, plan.user_offset + plan.users)
+    author_ids = rng.choices(
+        authors, cum_weights=plan.author_weights, k=end - start
+    )
+    rows = []
+    for index, author_id in zip(range(start, end), author_ids):
+        news_index = bisect_right(plan.comment_bounds, index)
+        since = plan.now - plan.published(news_index)
+        rows.append((
+            plan.comment_offset + index,
+            plan.news_offset + news_index,
+            author_id,
+            synthetic.paragraph(rng, WORDS, 1, 3),
+            plan.now - since * rng.random(),
+        ))
+    return rows
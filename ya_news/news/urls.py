@@ -1,16 +1,40 @@
 from django.urls import path
 
-from news import views
+from news import async_views, views
+from yacommon import instrumentation
 
 app_name = 'news'
 
 urlpatterns = [
     path('', views.NewsList.as_view(), name='home'),
+    path('search/', views.NewsSearch.as_view(), name='search'),
     path('news/<int:pk>/', views.NewsDetailView.as_view(), name='detail'),
+    path(
+        'news/<int:pk>/comments/',
+        views.NewsComments.as_view(),
+        name='comments'
+    ),
     path(
         'delete_comment/<int:pk>/',
         views.CommentDelete.as_view(),
         name='delete'
     ),
     path('edit_comment/<int:pk>/', views.CommentUpdate.as_view(), name='edit'),
+    path(
+        'import_comments/',
+        views.CommentImport.as_view(),
+        name='import_comments'
+    ),
+    path('async/', async_views.news_list, name='home_async'),
+    path(
+        'async/news/<int:pk>/',
+        async_views.news_detail,
+        name='detail_async'
+    ),
+    path(
+        'async/news/<int:pk>/comments/',
+        async_views.news_comments,
+        name='comments_async'
+    ),
+    path('metrics/', instrumentation.metrics_view, name='metrics'),
 ]
@@ -1,39 +1,137 @@
+import codecs
+from hashlib import md5
+from http import HTTPStatus
+
 from django.conf import settings
-from django.contrib.auth.mixins import LoginRequiredMixin
+from django.contrib.auth.mixins import (LoginRequiredMixin,
+                                        PermissionRequiredMixin)
+from django.db import transaction
+from django.http import Http404, HttpResponseRedirect, JsonResponse
 from django.shortcuts import get_object_or_404
 from django.urls import reverse
+from django.utils.decorators import method_decorator
 from django.views import generic
+from django.views.decorators.http import condition
+
+from yacommon.pagination import InvalidCursor, KeysetPaginator
 
+from . import moderation
 from .forms import CommentForm
+from .ingest import ingest_comments, read_records
 from .models import Comment, News
+from .page_cache import anonymous_page_cache
+from .search import get_backend
 
 
+@method_decorator(anonymous_page_cache, name='get')
 class NewsList(generic.ListView):
     """Список новостей."""
     model = News
     template_name = 'news/home.html'
+    context_object_name = 'news_list'
+    ordering = ('-date', '-id')
 
     def get_queryset(self):
         """
-        Выводим только несколько последних новостей.
+        Выводим страницу новостей, начиная с позиции курсора.
 
-        Их количество определяется в настройках проекта.
+        Размер страницы определяется в настройках проекта.
         """
-        return self.model.objects.prefetch_related(
-            'comment_set'
-        )[:settings.NEWS_COUNT_ON_HOME_PAGE]
+        paginator = KeysetPaginator(
+            self.model.objects.all(),
+            self.get_ordering(),
+            settings.NEWS_COUNT_ON_HOME_PAGE,
+        )
+        try:
+            self.page = paginator.page(self.request.GET.get('cursor'))
+        except InvalidCursor:
+            raise Http404('Некорректный курсор страницы.')
+        return self.page.object_list
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['page_obj'] = self.page
+        return context
+
+
+class NewsSearch(generic.ListView):
+    """Поиск новостей по заголовку и тексту."""
+    template_name = 'news/search.html'
+    context_object_name = 'news_list'
 
+    def get_queryset(self):
+        """Новости в порядке релевантности, не больше NEWS_SEARCH_RESULTS."""
+        self.query = self.request.GET.get('q', '').strip()
+        if not self.query:
+            return []
+        pks = get_backend().search(self.query, settings.NEWS_SEARCH_RESULTS)
+        found = News.objects.in_bulk(pks)
+        return [found[pk] for pk in pks if pk in found]
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['query'] = self.query
+        return context
+
+
+class CommentsPageMixin:
+    """
+    Постраничная выборка комментариев к новости.
+
+    Из пользователей загружается только то, что выводится в шаблоне.
+    """
+    comment_fields = (
+        'id', 'text', 'created', 'news_id', 'author_id', 'author__username'
+    )
+
+    def get_comments_page(self):
+        paginator = KeysetPaginator(
+            Comment.objects.filter(
+                news_id=self.kwargs['pk'], status=Comment.Status.PUBLISHED
+            ).select_related('author').only(*self.comment_fields),
+            ('created', 'id'),
+            settings.COMMENTS_COUNT_ON_NEWS_PAGE,
+        )
+        try:
+            return paginator.page(self.request.GET.get('cursor'))
+        except InvalidCursor:
+            raise Http404('Некорректный курсор комментариев.')
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['news_pk'] = self.kwargs['pk']
+        context['comments'] = self.get_comments_page()
+        return context
 
-class NewsDetail(generic.DetailView):
+
+def news_etag(request, pk):
+    """
+    ETag страницы новости без загрузки самой новости и комментариев.
+
+    Страница зависит от пользователя (ссылки на правку, форма с CSRF-токеном),
+    поэтому в тег входят его id и отпечаток CSRF-cookie.
+    """
+    version = News.objects.filter(pk=pk).values_list(
+        'version', flat=True
+    ).first()
+    if version is None:
+        return None
+    viewer = ''
+    if request.user.is_authenticated:
+        csrf_cookie = request.COOKIES.get(settings.CSRF_COOKIE_NAME, '')
+        viewer = '{}-{}'.format(
+            request.user.pk, md5(csrf_cookie.encode()).hexdigest()[:8]
+        )
+    return f'news-{pk}-{version}-{viewer}'
+
+
+@method_decorator(condition(etag_func=news_etag), name='get')
+class NewsDetail(CommentsPageMixin, generic.DetailView):
     model = News
     template_name = 'news/detail.html'
 
     def get_object(self, queryset=None):
-        obj = get_object_or_404(
-            self.model.objects.prefetch_related('comment_set__author'),
-            pk=self.kwargs['pk']
-        )
-        return obj
+        return get_object_or_404(self.model, pk=self.kwargs['pk'])
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -42,8 +140,36 @@ class NewsDetail(generic.DetailView):
         return context
 
 
+class NewsComments(CommentsPageMixin, generic.TemplateView):
+    """Очередная порция комментариев: HTML-фрагмент или JSON."""
+    template_name = 'news/comments.html'
+
+    def get_context_data(self, **kwargs):
+        if not News.objects.filter(pk=self.kwargs['pk']).exists():
+            raise Http404('Новость не найдена.')
+        return super().get_context_data(**kwargs)
+
+    def render_to_response(self, context, **response_kwargs):
+        if self.request.GET.get('format') != 'json':
+            return super().render_to_response(context, **response_kwargs)
+        page = context['comments']
+        return JsonResponse({
+            'comments': [
+                {
+                    'id': comment.pk,
+                    'author': comment.author.username,
+                    'text': comment.text,
+                    'created': comment.created,
+                }
+                for comment in page
+            ],
+            'next_cursor': page.next_cursor,
+        })
+
+
 class NewsComment(
         LoginRequiredMixin,
+        CommentsPageMixin,
         generic.detail.SingleObjectMixin,
         generic.FormView
 ):
@@ -59,7 +185,15 @@ class NewsComment(
         comment = form.save(commit=False)
         comment.news = self.object
         comment.author = self.request.user
-        comment.save()
+        if moderation.is_async():
+            # Счётчик увеличит пул модерации при публикации.
+            comment.status = Comment.Status.PENDING
+            comment.save()
+            transaction.on_commit(moderation.notify)
+            return super().form_valid(form)
+        with transaction.atomic():
+            News.objects.filter(pk=self.object.pk).change_comment_count(1)
+            comment.save()
         return super().form_valid(form)
 
     def get_success_url(self):
@@ -98,7 +232,55 @@ class CommentUpdate(CommentBase, generic.UpdateView):
     template_name = 'news/edit.html'
     form_class = CommentForm
 
+    def form_valid(self, form):
+        """При фоновой модерации исправленный текст проверяется заново."""
+        if not moderation.is_async():
+            return super().form_valid(form)
+        comment = form.save(commit=False)
+        with transaction.atomic():
+            if comment.status == Comment.Status.PUBLISHED:
+                News.objects.filter(
+                    pk=comment.news_id
+                ).change_comment_count(-1)
+            comment.status = Comment.Status.PENDING
+            comment.save()
+        transaction.on_commit(moderation.notify)
+        return HttpResponseRedirect(self.get_success_url())
+
 
 class CommentDelete(CommentBase, generic.DeleteView):
     """Удаление комментария."""
     template_name = 'news/delete.html'
+
+    def delete(self, request, *args, **kwargs):
+        comment = self.get_object()
+        with transaction.atomic():
+            if comment.status == Comment.Status.PUBLISHED:
+                News.objects.filter(
+                    pk=comment.news_id
+                ).change_comment_count(-1)
+            return super().delete(request, *args, **kwargs)
+
+
+class CommentImport(PermissionRequiredMixin, generic.View):
+    """
+    Пакетная загрузка комментариев.
+
+    Тело запроса — JSONL или CSV (Content-Type text/csv), читается потоком.
+    """
+    permission_required = 'news.add_comment'
+    http_method_names = ('post',)
+
+    def post(self, request, *args, **kwargs):
+        file_format = 'csv' if request.content_type == 'text/csv' else 'jsonl'
+        chunk_size = request.GET.get('chunk_size', '1000')
+        if not chunk_size.isdigit() or int(chunk_size) < 1:
+            return JsonResponse(
+                {'error': 'chunk_size должен быть целым числом от 1'},
+                status=HTTPStatus.BAD_REQUEST,
+            )
+        report = ingest_comments(
+            read_records(codecs.getreader('utf-8')(request), file_format),
+            int(chunk_size),
+        )
+        return JsonResponse(report.as_dict())
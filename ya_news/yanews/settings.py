@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 from django.urls import reverse_lazy
@@ -21,11 +22,14 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'yacommon.query_budget.QueryBudgetMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'yacommon.routers.PrimaryPinMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'yacommon.instrumentation.RequestTimingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -43,11 +47,25 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'news.context_processors.fragment_cache',
             ],
         },
     },
 ]
 
+# TEMPLATE_PROFILE=production: шаблоны из кэширующего загрузчика,
+# прогретые при старте (см. yacommon.template_cache). Отсутствующий шаблон
+# не даёт приложению запуститься.
+TEMPLATE_PROFILE = os.getenv('TEMPLATE_PROFILE', 'development')
+if TEMPLATE_PROFILE == 'production':
+    TEMPLATES[0]['APP_DIRS'] = False
+    TEMPLATES[0]['OPTIONS']['loaders'] = [
+        ('django.template.loaders.cached.Loader', [
+            'django.template.loaders.filesystem.Loader',
+            'django.template.loaders.app_directories.Loader',
+        ]),
+    ]
+
 WSGI_APPLICATION = 'yanews.wsgi.application'
 
 
@@ -58,9 +76,67 @@ DATABASES = {
     }
 }
 
+# Реплики для чтения: пути к копиям базы через запятую, например
+# DATABASE_REPLICAS=/var/lib/yanews/replica1.sqlite3,/var/lib/yanews/replica2.sqlite3
+# Реплика — копия основной базы с уже применёнными миграциями:
+#   sqlite3 db.sqlite3 ".backup /var/lib/yanews/replica1.sqlite3"
+# Миграции к репликам не применяются, копии обновляет внешняя репликация.
+# С реплик читают только веб-запросы, команды и фоновые потоки читают
+# основную базу.
+DATABASE_REPLICAS = []
+for number, path in enumerate(
+        filter(None, os.getenv('DATABASE_REPLICAS', '').split(',')), start=1):
+    DATABASES[f'replica_{number}'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': path,
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica_{number}')
+
+DATABASE_ROUTERS = ['yacommon.routers.PrimaryReplicaRouter']
+
+# Сколько секунд после записи пользователь читает из основной базы.
+DATABASE_PRIMARY_PIN_SECONDS = 10
+
+# DATABASE_PROFILE=production: WAL и другие PRAGMA для каждого соединения
+# (см. yacommon.signals.set_sqlite_pragmas) и постоянные соединения.
+DATABASE_PROFILE = os.getenv('DATABASE_PROFILE', 'development')
+SQLITE_PRODUCTION_PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,  # в КиБ, то есть 64 МиБ
+    'busy_timeout': 5000,
+}
+SQLITE_PRAGMAS = {}
+if DATABASE_PROFILE == 'production':
+    SQLITE_PRAGMAS = SQLITE_PRODUCTION_PRAGMAS
+    for database in DATABASES.values():
+        database['CONN_MAX_AGE'] = 600
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Отрендеренные карточки новостей и блоки комментариев.
+    # В продакшене: FRAGMENT_CACHE_BACKEND=django.core.cache.backends.filebased.FileBasedCache
+    # и FRAGMENT_CACHE_LOCATION=/var/tmp/yanews-fragments (или совместимый Redis-бэкенд).
+    'fragments': {
+        'BACKEND': os.getenv(
+            'FRAGMENT_CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache',
+        ),
+        'LOCATION': os.getenv('FRAGMENT_CACHE_LOCATION', 'yanews-fragments'),
+    },
+}
+
 
 AUTH_PASSWORD_VALIDATORS = []
 
+# Быстрый хэшер для тестов: PBKDF2 тратит сотни миллисекунд на каждый
+# create_user и login. Тесты подставляют его через override_settings.
+TEST_PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
 
 LANGUAGE_CODE = 'ru'
 
@@ -80,3 +156,68 @@ LOGIN_URL = reverse_lazy('users:login')
 LOGIN_REDIRECT_URL = reverse_lazy('news:home')
 
 NEWS_COUNT_ON_HOME_PAGE = 10
+COMMENTS_COUNT_ON_NEWS_PAGE = 20
+
+# Файл с дополнительными запрещёнными словами, по одному в строке.
+# Перечитывается автоматически при изменении.
+BAD_WORDS_FILE = os.getenv('BAD_WORDS_FILE')
+# True — искать слова только целиком, False — и их формы (по началу слова).
+BAD_WORDS_WHOLE_WORDS = False
+
+# 'sync' — проверять комментарии в запросе, 'async' — в пуле модерации.
+COMMENT_MODERATION = 'sync'
+COMMENT_MODERATION_CHECKS = (
+    'news.moderation.check_bad_words',
+)
+COMMENT_MODERATION_WORKERS = 2
+COMMENT_MODERATION_BATCH_SIZE = 100
+COMMENT_MODERATION_POLL_INTERVAL = 5
+# False — пул запускается отдельно командой moderate_comments.
+COMMENT_MODERATION_IN_PROCESS = True
+
+FRAGMENT_CACHE_ALIAS = 'fragments'
+FRAGMENT_CACHE_TIMEOUT = 60 * 60
+# Увеличьте при изменении разметки карточек или комментариев.
+FRAGMENT_CACHE_VERSION = 1
+
+# Кэш главной страницы целиком для анонимных пользователей.
+NEWS_HOME_PAGE_CACHE = False
+NEWS_HOME_PAGE_CACHE_ALIAS = 'default'
+NEWS_HOME_PAGE_CACHE_TIMEOUT = 60 * 5
+
+# Бэкенд полнотекстового поиска: yacommon.search.SQLiteFTSBackend для SQLite,
+# yacommon.search.SimpleBackend для остальных баз.
+NEWS_SEARCH_BACKEND = 'yacommon.search.SQLiteFTSBackend'
+NEWS_SEARCH_RESULTS = 20
+
+# Сколько SQL-запросов может выполнить страница (GET) по имени маршрута
+# и сколько раз подряд допустим запрос одной формы. При превышении
+# yacommon.query_budget пишет предупреждение, а в тестах — падает.
+# Бюджеты посчитаны для авторизованного пользователя: два запроса
+# уходят на сессию и пользователя.
+QUERY_BUDGETS = {
+    'news:home': 3,
+    'news:home_async': 3,
+    'news:detail': 5,
+    'news:detail_async': 5,
+    'news:comments': 3,
+    'news:comments_async': 3,
+    'news:search': 4,
+    'news:edit': 4,
+    'news:delete': 4,
+}
+QUERY_REPEAT_LIMIT = 3
+QUERY_BUDGET_RAISE = False
+
+# Доля запросов (0..1), для которых замеряются фазы: заголовок
+# Server-Timing и метрики на /metrics/. 0 — замеры выключены.
+REQUEST_TIMING_SAMPLE_RATE = float(
+    os.getenv('REQUEST_TIMING_SAMPLE_RATE', '0')
+)
+# Имя метрики с временем фаз на /metrics/.
+REQUEST_TIMING_METRIC = 'yanews_request_phase_seconds'
+# Адреса сборщиков метрик, которым /metrics/ отдаётся без входа,
+# через запятую. Сотрудникам (is_staff) страница доступна всегда.
+METRICS_ALLOWED_IPS = list(
+    filter(None, os.getenv('METRICS_ALLOWED_IPS', '').split(','))
+)
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Общий код YaNews и YaNote — пакет yacommon в корне репозитория.
+sys.path.append(str(Path(__file__).resolve().parents[2]))
@@ -0,0 +1,73 @@
+"""
+Нагрузочный тест YaNote: локальный сервер, сценарии пользователей, перцентили.
+
+Создаёт временную базу с синтетическими заметками пользователей,
+запускает локальный сервер и гоняет на него виртуальных пользователей.
+Каждый входит на сайт и по кругу проходит сценарий: новая заметка,
+список заметок, сама заметка, правка и удаление.
+Сервер, замер и отчёт — в yacommon.loadtest.
+Запуск из каталога ya_note:
+
+    python -m benchmarks.load --users 20 --seconds 30 --output base.json
+    python -m benchmarks.load --users 20 --seconds 30 --compare base.json
+
+benchmarks/baseline.json — прогон с параметрами по умолчанию; они и версии
+Python и Django записаны в его meta.
+"""
+from pathlib import Path
+
+from yacommon import loadtest
+
+
+def flow(client, rng):
+    """Создание, список, просмотр, правка и удаление заметки."""
+    slug = f'{client.username}-{rng.getrandbits(48):012x}'
+    client.get('notes:add', '/add/')
+    client.post('notes:add', '/add/', {
+        'title': 'Заметка', 'text': 'Текст заметки', 'slug': slug,
+    })
+    client.get('notes:list', '/notes/')
+    client.get('notes:detail', f'/note/{slug}/')
+    edit = f'/edit/{slug}/'
+    client.get('notes:edit', edit)
+    client.post('notes:edit', edit, {
+        'title': 'Заметка', 'text': 'Исправленный текст', 'slug': slug,
+    })
+    delete = f'/delete/{slug}/'
+    client.get('notes:delete', delete)
+    client.post('notes:delete', delete, {})
+
+
+def add_arguments(parser):
+    parser.add_argument('--notes', type=int, default=1000,
+                        help='Заметок у каждого пользователя.')
+
+
+def seed(args):
+    """Синтетические заметки каждого пользователя."""
+    from django.contrib.auth import get_user_model
+
+    from notes.models import Note
+
+    author_ids = get_user_model().objects.values_list('pk', flat=True)
+    Note.objects.bulk_create(
+        (Note(title=f'Заметка {number}', text='Текст заметки ' * 20,
+              slug=f'seed-{author_id}-{number}', author_id=author_id)
+         for author_id in author_ids
+         for number in range(args.notes)),
+        batch_size=1000,
+    )
+    print(f'Заметок у каждого пользователя: {args.notes}')
+    return flow, {'notes': args.notes}
+
+
+if __name__ == '__main__':
+    loadtest.main(
+        project='ya_note',
+        settings_module='yanote.settings',
+        module='benchmarks.load',
+        directory=Path(__file__).resolve().parent.parent,
+        description=__doc__,
+        add_arguments=add_arguments,
+        seed=seed,
+    )
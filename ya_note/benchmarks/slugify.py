@@ -0,0 +1,62 @@
+"""
+Сравнение кэшированной транслитерации заголовков с pytils.slugify.
+
+Имитирует массовую загрузку заметок, где заголовки повторяются.
+Запуск из каталога ya_note:
+
+    python -m benchmarks.slugify --notes 100000 --titles 500
+"""
+import argparse
+import os
+import random
+from timeit import timeit
+
+import django
+
+ALPHABET = 'абвгдежзийклмнопрстуфхцчшщэюя'
+
+
+def random_title(rng):
+    return ' '.join(
+        ''.join(rng.choices(ALPHABET, k=rng.randint(3, 10))).capitalize()
+        for _ in range(rng.randint(2, 6))
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--notes', type=int, default=100000,
+                        help='Сколько заметок загружается.')
+    parser.add_argument('--titles', type=int, default=500,
+                        help='Сколько среди них разных заголовков.')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yanote.settings')
+    django.setup()
+    from pytils.translit import slugify as translit_slugify
+
+    from notes import slugs
+
+    rng = random.Random(args.seed)
+    pool = [random_title(rng) for _ in range(args.titles)]
+    titles = rng.choices(pool, k=args.notes)
+    slugs.cache_clear()
+    plain_seconds = timeit(
+        lambda: [translit_slugify(title) for title in titles], number=1
+    )
+    cached_seconds = timeit(
+        lambda: [slugs.slugify(title) for title in titles], number=1
+    )
+    stats = slugs.cache_stats()
+    per_note = (plain_seconds - cached_seconds) / args.notes * 1e6
+    print(f'Заметок: {args.notes}, разных заголовков: {args.titles}')
+    print(f'pytils.slugify:  {plain_seconds * 1000:9.1f} мс')
+    print(f'С кэшем:         {cached_seconds * 1000:9.1f} мс')
+    print(f'Экономия:        {per_note:9.2f} мкс на заметку')
+    print(f'Кэш: {stats["size"]}/{stats["maxsize"]}, '
+          f'попаданий {stats["hit_rate"]:.1%}')
+
+
+if __name__ == '__main__':
+    main()
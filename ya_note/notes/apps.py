@@ -4,3 +4,18 @@ from django.apps import AppConfig
 class NotesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'notes'
+
+    def ready(self):
+        from django.conf import settings
+        from django.core.exceptions import ImproperlyConfigured
+
+        import yacommon.signals  # noqa: F401
+        from yacommon import template_cache
+
+        from . import signals  # noqa: F401
+        from .slugs import warm
+        warm(settings.NOTES_SLUGIFY_WARM_TITLES)
+        if settings.TEMPLATE_PROFILE == 'production':
+            errors = template_cache.warm()
+            if errors:
+                raise ImproperlyConfigured('\n'.join(errors))
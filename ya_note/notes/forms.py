@@ -1,29 +1,34 @@
-from pytils.translit import slugify
-
 from django import forms
 from django.core.exceptions import ValidationError
 
+from yacommon.instrumentation import TimedFormMixin
+
 from .models import Note
 
 WARNING = ' - такой slug уже существует, придумайте уникальное значение!'
 
 
-class NoteForm(forms.ModelForm):
+class NoteForm(TimedFormMixin, forms.ModelForm):
     """Форма для создания или обновления заметки."""
 
     class Meta:
         model = Note
         fields = ('title', 'text', 'slug')
 
-    def clean_slug(self):
-        """Обрабатывает случай, если slug не уникален."""
-        cleaned_data = super().clean()
-        slug = cleaned_data.get('slug')
-        if not slug:
-            title = cleaned_data.get('title')
-            slug = slugify(title)[:100]
-        if Note.objects.filter(
-                slug=slug
-        ).exclude(id=self.instance.pk).exists():
-            raise ValidationError(slug + WARNING)
-        return slug
+    def validate_unique(self):
+        """
+        Проверяет уникальность всех полей, кроме slug.
+
+        Slug проверяет индекс в базе при сохранении: пустой заметка
+        подберёт сама, а занятый явно указанный вид отклоняет
+        с ошибкой slug_taken().
+        """
+        exclude = [*self._get_validation_exclusions(), 'slug']
+        try:
+            self.instance.validate_unique(exclude=exclude)
+        except ValidationError as error:
+            self._update_errors(error)
+
+    def slug_taken(self):
+        slug = self.cleaned_data.get('slug')
+        self.add_error('slug', slug + WARNING)
@@ -0,0 +1,84 @@
+import os
+import time
+from multiprocessing import Pool
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from yacommon import synthetic
+from yacommon.bulk import insert, next_id
+
+from notes import synthetic as notes_synthetic
+from notes.models import Note
+from notes.search import get_backend
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет базу синтетическими пользователями и заметками '
+        'для проверки на больших объёмах.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100000)
+        parser.add_argument(
+            '--notes', type=int, default=1000000,
+            help='Всего заметок; по авторам они распределяются '
+                 'по закону Ципфа.',
+        )
+        parser.add_argument(
+            '--zipf', type=float, default=1.1,
+            help='Показатель распределения: чем больше, тем длиннее хвост.',
+        )
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument(
+            '--processes', type=int, default=os.cpu_count(),
+            help='Сколько процессов генерируют строки.',
+        )
+        parser.add_argument('--chunk-size', type=int, default=10000)
+
+    def handle(self, *args, users, notes, zipf, seed, processes,
+               chunk_size, **options):
+        if notes and not users:
+            raise CommandError(
+                'Заметкам нужны авторы: задайте --users больше нуля.'
+            )
+        started = time.monotonic()
+        plan = notes_synthetic.Plan(
+            seed, users, notes, zipf, next_id(User), next_id(Note)
+        )
+        password = make_password(None)
+        # Дочерние процессы не должны наследовать открытые соединения.
+        connections.close_all()
+        with Pool(processes, synthetic.init_worker, (plan,)) as pool:
+            counts = {
+                'auth.User': insert(
+                    pool, User, synthetic.make_users, users, chunk_size,
+                    lambda row: User(
+                        id=row[0], username=row[1], password=password
+                    ),
+                ),
+                'notes.Note': insert(
+                    pool, Note, notes_synthetic.make_notes, notes,
+                    chunk_size,
+                    lambda row: Note(
+                        id=row[0], title=row[1], text=row[2], slug=row[3],
+                        author_id=row[4],
+                    ),
+                ),
+            }
+        if notes:
+            # bulk_create не отправляет сигналы, индекс строим заново.
+            get_backend().rebuild()
+        seconds = time.monotonic() - started
+        total = sum(counts.values())
+        for label, count in counts.items():
+            self.stdout.write(f'{label}: {count}')
+        self.stdout.write(
+            f'Создано объектов: {total} за {seconds:.1f} с '
+            f'({total / seconds if seconds else 0:.0f} объектов/с).'
+        )
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from notes.models import Note
+from notes.search import get_backend
+
+
+class Command(BaseCommand):
+    help = (
+        'Заново строит поисковый индекс заметок, например после '
+        'загрузки через bulk_create.'
+    )
+
+    def handle(self, *args, **options):
+        get_backend().rebuild()
+        self.stdout.write(
+            f'Проиндексировано заметок: {Note.objects.count()}.'
+        )
@@ -0,0 +1,45 @@
+from django.db import migrations
+
+from yacommon.stemmer import stem_text
+
+TABLE = 'notes_note_search'
+
+
+def create_index(apps, schema_editor):
+    """Индекс FTS5 нужен только в SQLite, другие базы ищут без него."""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        f'CREATE VIRTUAL TABLE {TABLE} USING fts5('
+        'title, text, author_id UNINDEXED, '
+        "tokenize = 'unicode61 remove_diacritics 2')"
+    )
+    Note = apps.get_model('notes', 'Note')
+    rows = [
+        (pk, stem_text(title), stem_text(text), author_id)
+        for pk, title, text, author_id in Note.objects.values_list(
+            'pk', 'title', 'text', 'author_id'
+        )
+    ]
+    with schema_editor.connection.cursor() as cursor:
+        cursor.executemany(
+            f'INSERT INTO {TABLE} (rowid, title, text, author_id) '
+            'VALUES (%s, %s, %s, %s)',
+            rows,
+        )
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE {TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0003_note_author_id_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
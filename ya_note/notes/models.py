@@ -1,7 +1,25 @@
 from django.conf import settings
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.utils.crypto import get_random_string
 
-from pytils.translit import slugify
+from .slugs import slugify
+
+SLUG_ATTEMPTS = 5
+SLUG_SUFFIX_LENGTH = 4
+SLUG_SUFFIX_CHARS = 'abcdefghijklmnopqrstuvwxyz0123456789'
+
+
+def is_slug_conflict(error):
+    """
+    Нарушен ли уникальный индекс slug.
+
+    Базы называют в тексте ошибки колонку или индекс: «UNIQUE constraint
+    failed: notes_note.slug» в SQLite, «notes_note_slug_key» в PostgreSQL.
+    """
+    message = str(error).lower()
+    return 'slug' in message and (
+        'unique' in message or 'duplicate' in message
+    )
 
 
 class Note(models.Model):
@@ -27,12 +45,39 @@ class Note(models.Model):
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
     )
+    updated = models.DateTimeField('Изменена', auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=('author', 'id'), name='note_author_id_idx'),
+        ]
 
     def __str__(self):
         return self.title
 
     def save(self, *args, **kwargs):
-        if not self.slug:
-            max_slug_length = self._meta.get_field('slug').max_length
-            self.slug = slugify(self.title)[:max_slug_length]
-        super().save(*args, **kwargs)
+        """
+        Пустой slug строится из заголовка.
+
+        Уникальность проверяет индекс в базе, а не запрос перед вставкой:
+        при конфликте к slug добавляется короткий случайный суффикс
+        и сохранение повторяется, что безопасно и при параллельной записи.
+        """
+        if self.slug:
+            return super().save(*args, **kwargs)
+        max_slug_length = self._meta.get_field('slug').max_length
+        base = slugify(self.title)[:max_slug_length]
+        self.slug = base
+        for attempt in range(SLUG_ATTEMPTS):
+            try:
+                with transaction.atomic():
+                    return super().save(*args, **kwargs)
+            except IntegrityError as error:
+                if (not is_slug_conflict(error)
+                        or attempt == SLUG_ATTEMPTS - 1):
+                    self.slug = ''
+                    raise
+                suffix = '-' + get_random_string(
+                    SLUG_SUFFIX_LENGTH + attempt, SLUG_SUFFIX_CHARS
+                )
+                self.slug = base[:max_slug_length - len(suffix)] + suffix
@@ -0,0 +1,18 @@
+"""
+Полнотекстовый поиск по заметкам.
+
+Бэкенд из yacommon.search выбирается настройкой NOTES_SEARCH_BACKEND;
+индекс обновляется обработчиками сигналов в signals.py.
+В индексе хранится и автор заметки, чтобы искать только среди его
+заметок.
+"""
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from .models import Note
+
+
+def get_backend():
+    return import_string(settings.NOTES_SEARCH_BACKEND)(
+        Note, ('title', 'text'), weights=(2.0, 1.0), scope='author_id'
+    )
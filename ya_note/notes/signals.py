@@ -0,0 +1,19 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import search
+from .models import Note
+
+SEARCH_FIELDS = {'title', 'text', 'author'}
+
+
+@receiver(post_save, sender=Note)
+def index_note(sender, instance, update_fields=None, **kwargs):
+    """Переиндексирует заметку, если изменились поля для поиска."""
+    if update_fields is None or SEARCH_FIELDS & set(update_fields):
+        search.get_backend().index(instance)
+
+
+@receiver(post_delete, sender=Note)
+def unindex_note(sender, instance, **kwargs):
+    search.get_backend().remove(instance.pk)
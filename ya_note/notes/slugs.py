@@ -0,0 +1,57 @@
+"""
+Транслитерация заголовков заметок в slug с кэшем.
+
+pytils.translit.slugify заметно дороже поиска в словаре, а заголовки
+при массовой загрузке часто повторяются. Кэш ограничен размером
+NOTES_SLUGIFY_CACHE_SIZE и вытесняет давно не использованные заголовки.
+"""
+from functools import lru_cache
+from threading import Lock
+
+from django.conf import settings
+from pytils.translit import slugify as translit_slugify
+
+_cached_slugify = None
+_lock = Lock()
+
+
+def get_cached_slugify():
+    """Кэширующая обёртка; пересоздаётся, если изменился размер кэша."""
+    global _cached_slugify
+    maxsize = settings.NOTES_SLUGIFY_CACHE_SIZE
+    cached = _cached_slugify
+    if cached is None or cached.cache_info().maxsize != maxsize:
+        with _lock:
+            cached = _cached_slugify
+            if cached is None or cached.cache_info().maxsize != maxsize:
+                cached = _cached_slugify = lru_cache(maxsize)(
+                    translit_slugify
+                )
+    return cached
+
+
+def slugify(title):
+    return get_cached_slugify()(title)
+
+
+def warm(titles):
+    """Заранее заполняет кэш slug для частых заголовков."""
+    for title in titles:
+        slugify(title)
+
+
+def cache_clear():
+    get_cached_slugify().cache_clear()
+
+
+def cache_stats():
+    """Размер кэша и доля попаданий."""
+    info = get_cached_slugify().cache_info()
+    calls = info.hits + info.misses
+    return {
+        'size': info.currsize,
+        'maxsize': info.maxsize,
+        'hits': info.hits,
+        'misses': info.misses,
+        'hit_rate': info.hits / calls if calls else 0,
+    }
@@ -0,0 +1,61 @@
+"""
+Синтетические заметки для проверки на больших объёмах.
+
+Число заметок у авторов распределено по закону Ципфа: у немногих
+их тысячи, у большинства — единицы. Общая часть — в yacommon.synthetic;
+модуль не обращается к Django, чтобы работать и при запуске
+процессов через spawn.
+"""
+from bisect import bisect_right
+from itertools import accumulate
+
+from pytils.translit import slugify
+
+from yacommon import synthetic
+from yacommon.synthetic import current_plan
+
+WORDS = (
+    'купить', 'молоко', 'хлеб', 'позвонить', 'маме', 'врачу', 'записаться',
+    'оплатить', 'счёт', 'квартира', 'интернет', 'забрать', 'посылку',
+    'почта', 'отчёт', 'работа', 'встреча', 'проект', 'задача', 'срок',
+    'идея', 'книга', 'прочитать', 'фильм', 'посмотреть', 'подарок',
+    'день', 'рождения', 'отпуск', 'билеты', 'поезд', 'гостиница',
+    'список', 'продукты', 'редиска', 'огурцы', 'сыр', 'яблоки', 'кофе',
+    'ремонт', 'краска', 'обои', 'мастер', 'машина', 'шины', 'страховка',
+    'спортзал', 'тренировка', 'бег', 'утром', 'вечером', 'завтра',
+    'сегодня', 'в', 'понедельник', 'пятницу', 'выходные', 'обязательно',
+    'не', 'забыть', 'проверить', 'написать', 'отправить', 'подготовить',
+    'обсудить', 'с', 'коллегами', 'соседом', 'на', 'и', 'до', 'после',
+)
+
+
+class Plan(synthetic.Plan):
+    """Размеры и распределение заметок по авторам."""
+
+    def __init__(self, seed, users, notes, exponent, user_offset,
+                 note_offset):
+        super().__init__(seed, users, user_offset)
+        self.notes = notes
+        self.note_offset = note_offset
+        self.note_bounds = list(accumulate(synthetic.zipf_counts(
+            notes, synthetic.zipf_weights(users, exponent, seed, 'authors')
+        )))
+
+
+def make_notes(bounds):
+    """Заметки: (id, title, text, slug, author_id)."""
+    start, end = bounds
+    plan = current_plan()
+    rng = plan.rng('notes', start)
+    rows = []
+    for index in range(start, end):
+        note_id = plan.note_offset + index
+        note_title = synthetic.title(rng, WORDS, 100)
+        rows.append((
+            note_id,
+            note_title,
+            synthetic.paragraph(rng, WORDS, 1, 5),
+            f'{slugify(note_title)[:80]}-{note_id}',
+            plan.user_offset + bisect_right(plan.note_bounds, index),
+        ))
+    return rows
@@ -0,0 +1,7 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def query_budget(settings):
+    """В тестах превышение бюджета запросов и N+1 роняют запрос."""
+    settings.QUERY_BUDGET_RAISE = True
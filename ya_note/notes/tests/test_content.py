@@ -1,9 +1,16 @@
-from django.test import TestCase
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.template import engines
+from django.test import TestCase, override_settings
 from django.contrib.auth.models import User
 from django.urls import reverse
 from notes.models import Note
+from yacommon.template_cache import warm
 
 
+@override_settings(PASSWORD_HASHERS=settings.TEST_PASSWORD_HASHERS)
 class TestContent(TestCase):
     @classmethod
     def setUpTestData(cls):
@@ -44,3 +51,50 @@ class TestContent(TestCase):
             with self.subTest(url=url):
                 response = self.client.get(url)
                 self.assertIn('form', response.context)
+
+    @override_settings(NOTES_COUNT_ON_LIST_PAGE=2)
+    def test_notes_list_is_paginated_by_cursor(self):
+        """Список заметок листается по курсору без пропусков и повторов"""
+        for number in range(4):
+            Note.objects.create(title=f'Note {number}', text='Text',
+                                author=self.author)
+        expected = list(Note.objects.filter(
+            author=self.author).order_by('id').values_list('id', flat=True))
+        seen = []
+        url = reverse('notes:list')
+        while url:
+            response = self.client.get(url)
+            page = response.context['page_obj']
+            self.assertLessEqual(len(page), 2)
+            seen.extend(note.id for note in page)
+            url = (f'{reverse("notes:list")}?cursor={page.next_cursor}'
+                   if page.has_next() else None)
+        self.assertEqual(seen, expected)
+
+    def test_notes_list_bad_cursor(self):
+        """Некорректный курсор списка заметок даёт 404"""
+        response = self.client.get(reverse('notes:list') + '?cursor=bad')
+        self.assertEqual(response.status_code, 404)
+
+    def test_templates_are_warmed(self):
+        """Прогрев кладёт шаблоны в кэширующий загрузчик и находит
+        подключение несуществующего шаблона"""
+        template = settings.TEMPLATES[0]
+        cached = {**template, 'APP_DIRS': False, 'OPTIONS': {
+            **template['OPTIONS'], 'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ]}}
+        with override_settings(TEMPLATES=[cached]):
+            self.assertEqual(warm(), [])
+            loader = engines['django'].engine.template_loaders[0]
+            self.assertIn('notes/list.html', loader.get_template_cache)
+        with tempfile.TemporaryDirectory() as directory:
+            Path(directory, 'broken.html').write_text(
+                '{% include "includes/missing.html" %}')
+            broken = {**template, 'DIRS': [*template['DIRS'], directory]}
+            with override_settings(TEMPLATES=[broken]):
+                self.assertEqual(warm(), [
+                    'broken.html: не найден шаблон includes/missing.html'])
@@ -1,17 +1,36 @@
-from django.test import TestCase
+import tempfile
+from collections import Counter
+from http import HTTPStatus
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.conf import settings
+from django.db import IntegrityError
+from django.core.management import call_command
+from django.test import TestCase, override_settings
 from django.urls import reverse
 from django.contrib.auth import get_user_model
+from notes import slugs
+from notes.forms import WARNING
+from yacommon.instrumentation import metrics
 from notes.models import Note
+from yacommon.query_budget import QueryBudgetExceeded
+from yacommon.routers import PIN_COOKIE, PrimaryReplicaRouter
 from pytils.translit import slugify
 from django.http import HttpResponseNotFound
 
 User = get_user_model()
 
 
+@override_settings(PASSWORD_HASHERS=settings.TEST_PASSWORD_HASHERS)
 class TestLogic(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='testuser',
+                                            password='testpass')
+
     def setUp(self):
-        self.user = User.objects.create_user(username='testuser',
-                                             password='testpass')
         self.note_data = {'title': 'Test Note', 'text': 'Test Text'}
 
     def test_logged_in_user_can_create_note(self):
@@ -20,6 +39,7 @@ class TestLogic(TestCase):
         response = self.client.post(reverse('notes:add'), self.note_data)
         self.assertRedirects(response, reverse('notes:success'))
         self.assertEqual(Note.objects.count(), 1)
+        self.assertIn(PIN_COOKIE, response.cookies)
 
     def test_anonymous_user_cannot_create_note(self):
         """Анонимный пользователь не может создать заметку"""
@@ -33,12 +53,37 @@ class TestLogic(TestCase):
     def test_cannot_create_two_notes_with_same_slug(self):
         """Невозможно создать две заметки с одинаковым slug"""
         self.client.login(username='testuser', password='testpass')
-        response = self.client.post(reverse('notes:add'), self.note_data)
+        note_data = {**self.note_data, 'slug': 'test-slug'}
+        response = self.client.post(reverse('notes:add'), note_data)
         self.assertRedirects(response, reverse('notes:success'))
         self.assertEqual(Note.objects.count(), 1)
-        response = self.client.post(reverse('notes:add'), self.note_data)
+        response = self.client.post(reverse('notes:add'), note_data)
+        self.assertFormError(response, 'form', 'slug',
+                             'test-slug' + WARNING)
         self.assertEqual(Note.objects.count(), 1)
 
+    def test_generated_slug_gets_unique_suffix(self):
+        """Автоматический slug при совпадении получает суффикс"""
+        self.client.login(username='testuser', password='testpass')
+        for _ in range(3):
+            response = self.client.post(reverse('notes:add'), self.note_data)
+            self.assertRedirects(response, reverse('notes:success'))
+        slugs = set(Note.objects.values_list('slug', flat=True))
+        base = slugify(self.note_data['title'])
+        self.assertEqual(len(slugs), 3)
+        self.assertIn(base, slugs)
+        self.assertTrue(all(slug.startswith(base) for slug in slugs))
+
+    def test_other_integrity_error_is_not_retried(self):
+        """Нарушение других ограничений не выдаётся за занятый slug"""
+        note = Note(title='Без текста', text=None, author=self.user)
+        with mock.patch('notes.models.get_random_string') as suffix:
+            with self.assertRaisesMessage(IntegrityError,
+                                          'notes_note.text'):
+                note.save()
+        suffix.assert_not_called()
+        self.assertFalse(Note.objects.exists())
+
     def test_slug_is_generated_automatically(self):
         """Если при создании заметки не заполнен slug,
         то он формируется автоматически"""
@@ -49,6 +94,15 @@ class TestLogic(TestCase):
         expected_slug = slugify(self.note_data['title'])
         self.assertEqual(note.slug, expected_slug)
 
+    def test_slugify_cache_is_reused(self):
+        """Повторный заголовок транслитерируется из кэша"""
+        slugs.cache_clear()
+        for _ in range(2):
+            Note.objects.create(title='Одинаковый заголовок', text='Текст',
+                                author=self.user)
+        stats = slugs.cache_stats()
+        self.assertEqual((stats['misses'], stats['hits']), (1, 1))
+
     def test_user_can_edit_and_delete_own_notes(self):
         """Пользователь может редактировать и удалять свои заметки"""
         self.client.login(username='testuser', password='testpass')
@@ -90,3 +144,80 @@ class TestLogic(TestCase):
             response = self.client.post(delete_url)
             self.assertEqual(response.status_code,
                              HttpResponseNotFound.status_code)
+
+    def test_search_finds_only_own_notes(self):
+        """Поиск находит формы слова только среди заметок пользователя"""
+        other_user = User.objects.create_user(username='otheruser',
+                                              password='testpass')
+        own = Note.objects.create(title='Покупки', text='Купить редиску',
+                                  author=self.user)
+        Note.objects.create(title='Чужие покупки', text='Редиска',
+                            author=other_user)
+        self.client.login(username='testuser', password='testpass')
+        url = reverse('notes:search')
+        response = self.client.get(url, {'q': 'редиска'})
+        self.assertEqual(list(response.context['object_list']), [own])
+        own.delete()
+        response = self.client.get(url, {'q': 'редиска'})
+        self.assertEqual(list(response.context['object_list']), [])
+
+    @override_settings(DATABASE_REPLICAS=['replica_1'])
+    def test_reads_outside_requests_use_primary(self):
+        """Команды и фоновые потоки читают из основной базы, а не с реплики"""
+        self.assertEqual(PrimaryReplicaRouter().db_for_read(Note), 'default')
+
+    @override_settings(QUERY_BUDGET_RAISE=True,
+                       QUERY_BUDGETS={'notes:list': 2})
+    def test_query_budget_is_enforced(self):
+        """Список заметок, превысивший бюджет запросов, роняет тест"""
+        self.client.login(username='testuser', password='testpass')
+        with self.assertRaises(QueryBudgetExceeded):
+            self.client.get(reverse('notes:list'))
+
+    @override_settings(REQUEST_TIMING_SAMPLE_RATE=1)
+    def test_request_timing(self):
+        """Создание заметки замеряется по фазам и попадает в /metrics/"""
+        metrics.reset()
+        self.client.login(username='testuser', password='testpass')
+        response = self.client.post(reverse('notes:add'), self.note_data)
+        for phase in ('resolve', 'auth', 'db', 'form', 'total'):
+            self.assertIn(f'{phase};dur=', response['Server-Timing'])
+        metrics_url = reverse('notes:metrics')
+        self.assertEqual(self.client.get(metrics_url).status_code,
+                         HTTPStatus.FORBIDDEN)
+        self.user.is_staff = True
+        self.user.save()
+        text = self.client.get(metrics_url).content.decode()
+        self.assertIn('yanote_request_phase_seconds_count'
+                      '{view="notes:add",phase="form"} 1', text)
+
+    def test_generate_data_is_reproducible(self):
+        """Синтетические заметки зависят от seed, но не от числа процессов"""
+        options = {'users': 20, 'notes': 300, 'chunk_size': 50}
+        generated = []
+        for processes in (2, 1):
+            Note.objects.all().delete()
+            User.objects.exclude(pk=self.user.pk).delete()
+            call_command('generate_data', processes=processes,
+                         stdout=StringIO(), **options)
+            generated.append(list(Note.objects.order_by('id').values_list(
+                'id', 'title', 'slug', 'author')))
+        self.assertEqual(generated[0], generated[1])
+        notes_per_author = Counter(note[-1] for note in generated[0])
+        self.assertEqual(sum(notes_per_author.values()), options['notes'])
+        # Длинный хвост: у самого активного автора намного больше среднего.
+        self.assertGreater(max(notes_per_author.values()),
+                           3 * options['notes'] / options['users'])
+
+    def test_stream_dump_and_load_roundtrip(self):
+        """Заметки переживают потоковую выгрузку и загрузку."""
+        note = Note.objects.create(title='Заметка', text='Текст',
+                                   author=self.user)
+        with tempfile.TemporaryDirectory() as directory:
+            path = str(Path(directory) / 'dump.jsonl')
+            call_command('stream_dumpdata', 'notes.Note', output=path)
+            Note.objects.all().delete()
+            call_command('stream_loaddata', path)
+        loaded = Note.objects.get()
+        self.assertEqual((loaded.slug, loaded.updated),
+                         (note.slug, note.updated))
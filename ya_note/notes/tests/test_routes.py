@@ -1,9 +1,12 @@
-from django.http import HttpResponse, HttpResponseNotFound
-from django.test import TestCase, Client
+from django.conf import settings
+from django.http import (HttpResponse, HttpResponseNotFound,
+                         HttpResponseNotModified)
+from django.test import TestCase, Client, override_settings
 from django.contrib.auth.models import User
 from notes.models import Note
 
 
+@override_settings(PASSWORD_HASHERS=settings.TEST_PASSWORD_HASHERS)
 class TestRoutes(TestCase):
     @classmethod
     def setUpTestData(cls):
@@ -48,6 +51,19 @@ class TestRoutes(TestCase):
                     self.assertEqual(response.status_code, status_code)
             self.client.logout()
 
+    def test_note_detail_not_modified(self):
+        """Неизменённая заметка отвечает 304, после правки — 200."""
+        self.client.login(username='author', password='testpass')
+        url = f'/note/{self.note.slug}/'
+        etag = self.client.get(url)['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code,
+                         HttpResponseNotModified.status_code)
+        self.note.text = 'Новый текст'
+        self.note.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HttpResponse.status_code)
+
     def test_anonymous_user_redirected_to_login(self):
         """Редирект анонимного пользователя на страницу логина"""
         urls = ('/notes/', '/done/', '/add/',
@@ -1,6 +1,7 @@
 from django.urls import path
 
 from notes import views
+from yacommon import instrumentation
 
 app_name = 'notes'
 
@@ -11,5 +12,7 @@ urlpatterns = [
     path('note/<slug:slug>/', views.NoteDetail.as_view(), name='detail'),
     path('delete/<slug:slug>/', views.NoteDelete.as_view(), name='delete'),
     path('notes/', views.NotesList.as_view(), name='list'),
+    path('search/', views.NoteSearch.as_view(), name='search'),
     path('done/', views.NoteSuccess.as_view(), name='success'),
+    path('metrics/', instrumentation.metrics_view, name='metrics'),
 ]
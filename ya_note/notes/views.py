@@ -1,9 +1,17 @@
+from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.db import IntegrityError, transaction
+from django.http import Http404
 from django.urls import reverse_lazy
+from django.utils.decorators import method_decorator
 from django.views import generic
+from django.views.decorators.http import condition
+
+from yacommon.pagination import InvalidCursor, KeysetPaginator
 
 from .forms import NoteForm
-from .models import Note
+from .models import Note, is_slug_conflict
+from .search import get_backend
 
 
 class Home(generic.TemplateView):
@@ -26,22 +34,33 @@ class NoteBase(LoginRequiredMixin):
         return self.model.objects.filter(author=self.request.user)
 
 
-class NoteCreate(NoteBase, generic.CreateView):
-    """Добавление заметки."""
+class NoteFormMixin:
+    """Сохранение заметки с проверкой slug на уровне базы."""
     template_name = 'notes/form.html'
     form_class = NoteForm
 
     def form_valid(self, form):
-        new_note = form.save(commit=False)
-        new_note.author = self.request.user
-        new_note.save()
+        try:
+            with transaction.atomic():
+                return super().form_valid(form)
+        except IntegrityError as error:
+            if (not form.cleaned_data.get('slug')
+                    or not is_slug_conflict(error)):
+                raise
+            form.slug_taken()
+            return self.form_invalid(form)
+
+
+class NoteCreate(NoteBase, NoteFormMixin, generic.CreateView):
+    """Добавление заметки."""
+
+    def form_valid(self, form):
+        form.instance.author = self.request.user
         return super().form_valid(form)
 
 
-class NoteUpdate(NoteBase, generic.UpdateView):
+class NoteUpdate(NoteBase, NoteFormMixin, generic.UpdateView):
     """Редактирование заметки."""
-    template_name = 'notes/form.html'
-    form_class = NoteForm
 
 
 class NoteDelete(NoteBase, generic.DeleteView):
@@ -52,8 +71,68 @@ class NoteDelete(NoteBase, generic.DeleteView):
 class NotesList(NoteBase, generic.ListView):
     """Список всех заметок пользователя."""
     template_name = 'notes/list.html'
+    ordering = ('id',)
 
+    def get_queryset(self):
+        """
+        Выводим страницу заметок, начиная с позиции курсора.
+
+        Заметки автора выбираются по индексу (author, id), а из полей
+        загружаются только те, что выводятся в списке.
+        """
+        paginator = KeysetPaginator(
+            super().get_queryset().only('id', 'slug', 'title'),
+            self.get_ordering(),
+            settings.NOTES_COUNT_ON_LIST_PAGE,
+        )
+        try:
+            self.page = paginator.page(self.request.GET.get('cursor'))
+        except InvalidCursor:
+            raise Http404('Некорректный курсор страницы.')
+        return self.page.object_list
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['page_obj'] = self.page
+        return context
+
+
+class NoteSearch(NoteBase, generic.ListView):
+    """Поиск по заметкам пользователя."""
+    template_name = 'notes/search.html'
 
+    def get_queryset(self):
+        """Заметки в порядке релевантности, не больше NOTES_SEARCH_RESULTS."""
+        self.query = self.request.GET.get('q', '').strip()
+        if not self.query:
+            return []
+        pks = get_backend().search(
+            self.query,
+            settings.NOTES_SEARCH_RESULTS,
+            author_id=self.request.user.pk,
+        )
+        found = super().get_queryset().only('id', 'slug', 'title').in_bulk(
+            pks
+        )
+        return [found[pk] for pk in pks if pk in found]
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['query'] = self.query
+        return context
+
+
+def note_etag(request, slug):
+    """ETag заметки по времени её изменения, без загрузки самой заметки."""
+    updated = Note.objects.filter(
+        slug=slug, author=request.user
+    ).values_list('updated', flat=True).first()
+    if updated is None:
+        return None
+    return f'note-{slug}-{updated.timestamp()}'
+
+
+@method_decorator(condition(etag_func=note_etag), name='get')
 class NoteDetail(NoteBase, generic.DetailView):
     """Заметка подробно."""
     template_name = 'notes/detail.html'
@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 from django.urls import reverse_lazy
@@ -22,11 +23,14 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'yacommon.query_budget.QueryBudgetMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'yacommon.routers.PrimaryPinMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'yacommon.instrumentation.RequestTimingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -49,6 +53,19 @@ TEMPLATES = [
     },
 ]
 
+# TEMPLATE_PROFILE=production: шаблоны из кэширующего загрузчика,
+# прогретые при старте (см. yacommon.template_cache). Отсутствующий шаблон
+# не даёт приложению запуститься.
+TEMPLATE_PROFILE = os.getenv('TEMPLATE_PROFILE', 'development')
+if TEMPLATE_PROFILE == 'production':
+    TEMPLATES[0]['APP_DIRS'] = False
+    TEMPLATES[0]['OPTIONS']['loaders'] = [
+        ('django.template.loaders.cached.Loader', [
+            'django.template.loaders.filesystem.Loader',
+            'django.template.loaders.app_directories.Loader',
+        ]),
+    ]
+
 WSGI_APPLICATION = 'yanote.wsgi.application'
 
 
@@ -59,6 +76,44 @@ DATABASES = {
     }
 }
 
+# Реплики для чтения: пути к копиям базы через запятую, например
+# DATABASE_REPLICAS=/var/lib/yanote/replica1.sqlite3,/var/lib/yanote/replica2.sqlite3
+# Реплика — копия основной базы с уже применёнными миграциями:
+#   sqlite3 db.sqlite3 ".backup /var/lib/yanote/replica1.sqlite3"
+# Миграции к репликам не применяются, копии обновляет внешняя репликация.
+# С реплик читают только веб-запросы, команды и фоновые потоки читают
+# основную базу.
+DATABASE_REPLICAS = []
+for number, path in enumerate(
+        filter(None, os.getenv('DATABASE_REPLICAS', '').split(',')), start=1):
+    DATABASES[f'replica_{number}'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': path,
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica_{number}')
+
+DATABASE_ROUTERS = ['yacommon.routers.PrimaryReplicaRouter']
+
+# Сколько секунд после записи пользователь читает из основной базы.
+DATABASE_PRIMARY_PIN_SECONDS = 10
+
+# DATABASE_PROFILE=production: WAL и другие PRAGMA для каждого соединения
+# (см. yacommon.signals.set_sqlite_pragmas) и постоянные соединения.
+DATABASE_PROFILE = os.getenv('DATABASE_PROFILE', 'development')
+SQLITE_PRODUCTION_PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,  # в КиБ, то есть 64 МиБ
+    'busy_timeout': 5000,
+}
+SQLITE_PRAGMAS = {}
+if DATABASE_PROFILE == 'production':
+    SQLITE_PRAGMAS = SQLITE_PRODUCTION_PRAGMAS
+    for database in DATABASES.values():
+        database['CONN_MAX_AGE'] = 600
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -69,6 +124,10 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Быстрый хэшер для тестов: PBKDF2 тратит сотни миллисекунд на каждый
+# create_user и login. Тесты подставляют его через override_settings.
+TEST_PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
 
 LANGUAGE_CODE = 'ru'
 
@@ -87,3 +146,46 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 LOGIN_URL = reverse_lazy('users:login')
 LOGIN_REDIRECT_URL = reverse_lazy('notes:home')
+
+NOTES_COUNT_ON_LIST_PAGE = 50
+
+# Размер кэша транслитерации заголовков в slug и заголовки,
+# которыми кэш заполняется при запуске.
+NOTES_SLUGIFY_CACHE_SIZE = 1024
+NOTES_SLUGIFY_WARM_TITLES = ()
+
+# Бэкенд полнотекстового поиска: yacommon.search.SQLiteFTSBackend для SQLite,
+# yacommon.search.SimpleBackend для остальных баз.
+NOTES_SEARCH_BACKEND = 'yacommon.search.SQLiteFTSBackend'
+NOTES_SEARCH_RESULTS = 20
+
+# Сколько SQL-запросов может выполнить страница (GET) по имени маршрута
+# и сколько раз подряд допустим запрос одной формы. При превышении
+# yacommon.query_budget пишет предупреждение, а в тестах — падает.
+# Бюджеты посчитаны для авторизованного пользователя: два запроса
+# уходят на сессию и пользователя.
+QUERY_BUDGETS = {
+    'notes:home': 2,
+    'notes:list': 3,
+    'notes:detail': 4,
+    'notes:add': 2,
+    'notes:edit': 3,
+    'notes:delete': 3,
+    'notes:success': 2,
+    'notes:search': 4,
+}
+QUERY_REPEAT_LIMIT = 3
+QUERY_BUDGET_RAISE = False
+
+# Доля запросов (0..1), для которых замеряются фазы: заголовок
+# Server-Timing и метрики на /metrics/. 0 — замеры выключены.
+REQUEST_TIMING_SAMPLE_RATE = float(
+    os.getenv('REQUEST_TIMING_SAMPLE_RATE', '0')
+)
+# Имя метрики с временем фаз на /metrics/.
+REQUEST_TIMING_METRIC = 'yanote_request_phase_seconds'
+# Адреса сборщиков метрик, которым /metrics/ отдаётся без входа,
+# через запятую. Сотрудникам (is_staff) страница доступна всегда.
+METRICS_ALLOWED_IPS = list(
+    filter(None, os.getenv('METRICS_ALLOWED_IPS', '').split(','))
+)
@@ -0,0 +1,8 @@
+"""
+Код, общий для проектов YaNews и YaNote.
+
+Пакет лежит в корне репозитория. manage.py, wsgi.py и asgi.py проектов,
+их benchmarks и pytest.ini (опция pythonpath) добавляют корень в путь
+импорта. Настройки, которые различаются между проектами, берутся
+из settings.
+"""
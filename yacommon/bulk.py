@@ -0,0 +1,17 @@
+"""Вставка синтетических данных, которые генерирует yacommon.synthetic."""
+from django.db import transaction
+from django.db.models import Max
+
+from .synthetic import chunks
+
+
+def next_id(model):
+    return (model.objects.aggregate(Max('id'))['id__max'] or 0) + 1
+
+
+def insert(pool, model, make_rows, total, chunk_size, build):
+    """Вставляет порции строк по мере готовности, сохраняя порядок."""
+    for rows in pool.imap(make_rows, chunks(total, chunk_size)):
+        with transaction.atomic():
+            model.objects.bulk_create(map(build, rows))
+    return total
@@ -0,0 +1,219 @@
+"""
+Замеры фаз запроса: Server-Timing и метрики в формате Prometheus.
+
+Для доли запросов REQUEST_TIMING_SAMPLE_RATE RequestTimingMiddleware
+замеряет путь до view (разбор URL), загрузку пользователя из сессии,
+SQL-запросы, проверку форм и рендеринг шаблонов. Результат уходит
+в заголовок Server-Timing и в суммарные метрики REQUEST_TIMING_METRIC, которые
+отдаёт /metrics/ (сотрудникам и адресам из METRICS_ALLOWED_IPS).
+При нулевой доле замеры выключены: обёртки только читают ContextVar.
+"""
+import asyncio
+import random
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from threading import Lock
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.http import HttpResponse
+from django.utils.deprecation import MiddlewareMixin
+
+PHASES = ('resolve', 'auth', 'db', 'form', 'render', 'total')
+
+_timings = ContextVar('request_timings', default=None)
+
+
+class Timings:
+    """Время фаз одного запроса в секундах."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = defaultdict(float)
+        self.queries = 0
+        self.render_started = None
+        self.resolve_started = None
+
+    def add(self, name, seconds):
+        self.phases[name] += seconds
+
+    def server_timing(self):
+        parts = []
+        for name in PHASES:
+            if name not in self.phases:
+                continue
+            part = f'{name};dur={self.phases[name] * 1000:.2f}'
+            if name == 'db':
+                part += f';desc="{self.queries} queries"'
+            parts.append(part)
+        return ', '.join(parts)
+
+
+class Metrics:
+    """Суммарное время и число замеров по маршрутам и фазам."""
+
+    def __init__(self):
+        self._lock = Lock()
+        self._sums = defaultdict(float)
+        self._counts = defaultdict(int)
+
+    def observe(self, view_name, timings):
+        with self._lock:
+            for name, seconds in timings.phases.items():
+                self._sums[view_name, name] += seconds
+                self._counts[view_name, name] += 1
+
+    def reset(self):
+        with self._lock:
+            self._sums.clear()
+            self._counts.clear()
+
+    def render(self):
+        metric = settings.REQUEST_TIMING_METRIC
+        lines = [
+            f'# HELP {metric} Time spent in request phases.',
+            f'# TYPE {metric} summary',
+        ]
+        with self._lock:
+            for (view_name, phase), total in sorted(self._sums.items()):
+                labels = f'view="{view_name}",phase="{phase}"'
+                count = self._counts[view_name, phase]
+                lines.append(f'{metric}_sum{{{labels}}} {total:.6f}')
+                lines.append(f'{metric}_count{{{labels}}} {count}')
+        return '\n'.join(lines) + '\n'
+
+
+metrics = Metrics()
+
+
+@contextmanager
+def phase(name):
+    """Добавляет время блока к фазе name, если запрос замеряется."""
+    timings = _timings.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - started)
+
+
+def record_query(execute, sql, params, many, context):
+    """Обёртка execute, которую yacommon.signals ставит каждому соединению."""
+    timings = _timings.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.add('db', time.perf_counter() - started)
+        timings.queries += 1
+
+
+def install(connection):
+    """Ставит обёртку в начало списка, как query_budget.install()."""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, record_query)
+
+
+class TimedFormMixin:
+    """Замеряет проверку формы как фазу form."""
+
+    def full_clean(self):
+        with phase('form'):
+            super().full_clean()
+
+
+def load_user(request):
+    with phase('auth'):
+        request.user.is_authenticated
+
+
+class RequestTimingMiddleware(MiddlewareMixin):
+    """
+    Замеряет выбранные запросы; ставится после AuthenticationMiddleware.
+
+    Фаза resolve — от выхода из load_user() до process_view(): разбор
+    URL обработчиком и process_request следующих middleware. Ленивый
+    пользователь загружается заранее — только для замеряемых запросов.
+    """
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.sampled():
+            return self.get_response(request)
+        timings, token = self.start()
+        try:
+            load_user(request)
+            timings.resolve_started = time.perf_counter()
+            response = self.get_response(request)
+        finally:
+            _timings.reset(token)
+        return self.finish(request, response, timings)
+
+    async def __acall__(self, request):
+        if not self.sampled():
+            return await self.get_response(request)
+        timings, token = self.start()
+        try:
+            await sync_to_async(load_user)(request)
+            timings.resolve_started = time.perf_counter()
+            response = await self.get_response(request)
+        finally:
+            _timings.reset(token)
+        return self.finish(request, response, timings)
+
+    def sampled(self):
+        rate = settings.REQUEST_TIMING_SAMPLE_RATE
+        return rate > 0 and random.random() < rate
+
+    def start(self):
+        timings = Timings()
+        return timings, _timings.set(timings)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        timings = _timings.get()
+        if timings is not None and timings.resolve_started is not None:
+            timings.add(
+                'resolve', time.perf_counter() - timings.resolve_started
+            )
+
+    def process_template_response(self, request, response):
+        timings = _timings.get()
+        if timings is not None:
+            timings.render_started = time.perf_counter()
+            response.add_post_render_callback(
+                lambda rendered: timings.add(
+                    'render', time.perf_counter() - timings.render_started
+                )
+            )
+        return response
+
+    def finish(self, request, response, timings):
+        timings.add('total', time.perf_counter() - timings.started)
+        match = request.resolver_match
+        metrics.observe(match.view_name if match else '', timings)
+        response['Server-Timing'] = timings.server_timing()
+        return response
+
+
+def metrics_view(request):
+    """
+    Метрики в текстовом формате Prometheus.
+
+    Доступны сотрудникам и сборщику метрик с адреса из METRICS_ALLOWED_IPS.
+    """
+    address = request.META.get('REMOTE_ADDR')
+    if not (request.user.is_staff
+            or address in settings.METRICS_ALLOWED_IPS):
+        raise PermissionDenied
+    return HttpResponse(
+        metrics.render(), content_type='text/plain; version=0.0.4'
+    )
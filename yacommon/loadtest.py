@@ -0,0 +1,373 @@
+"""
+Общая часть нагрузочных тестов YaNews и YaNote.
+
+benchmarks/load.py проекта задаёт сценарий пользователя и синтетические
+данные, а main() отсюда создаёт временную базу, запускает в отдельном
+процессе локальный сервер — WSGI-сервер runserver или uvicorn для
+ASGI — и гоняет на него виртуальных пользователей. По каждому шагу
+считаются p50/p95/p99 и запросы в секунду. Результат пишется в JSON,
+а с --compare сравнивается с прежним прогоном: рост p95 или падение
+пропускной способности больше --tolerance — регрессия.
+
+Соединения keep-alive, поэтому алгоритм Нейгла выключен и у клиента,
+и у сервера: иначе ответ, записанный в сокет по частям, ждёт
+отложенного ACK клиента, и каждый запрос получает лишние ~40 мс.
+"""
+import argparse
+import importlib.util
+import json
+import logging
+import math
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from http.client import HTTPConnection, HTTPException
+from http.cookies import SimpleCookie
+from pathlib import Path
+from threading import Event, Lock, Thread
+from urllib.parse import urlencode
+
+import django
+
+PASSWORD = 'benchmark'
+PERCENTILES = (50, 95, 99)
+SERVER_START_TIMEOUT = 30
+
+
+class FlowError(Exception):
+    """Шаг сценария не удался; пользователь начинает сценарий заново."""
+
+
+class Recorder:
+    """Время ответов по шагам; пишет, только пока active."""
+
+    def __init__(self):
+        self._lock = Lock()
+        self.active = False
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def record(self, step, seconds, ok):
+        if not self.active:
+            return
+        with self._lock:
+            if ok:
+                self.latencies[step].append(seconds)
+            else:
+                self.errors[step] += 1
+
+
+class NoDelayHTTPConnection(HTTPConnection):
+    """HTTPConnection с TCP_NODELAY."""
+
+    def connect(self):
+        super().connect()
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+
+class Client:
+    """HTTP-клиент одного пользователя: keep-alive, cookie и CSRF-токен."""
+
+    def __init__(self, port, recorder):
+        self.connection = NoDelayHTTPConnection('127.0.0.1', port, timeout=30)
+        self.cookies = {}
+        self.recorder = recorder
+        self.username = None
+
+    def request(self, step, method, path, data=None, expect=200):
+        headers = {}
+        body = None
+        if self.cookies:
+            headers['Cookie'] = '; '.join(
+                f'{name}={value}' for name, value in self.cookies.items()
+            )
+        if data is not None:
+            body = urlencode(data)
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+            headers['X-CSRFToken'] = self.cookies.get('csrftoken', '')
+        started = time.perf_counter()
+        try:
+            self.connection.request(method, path, body, headers)
+            response = self.connection.getresponse()
+            content = response.read()
+        except (OSError, HTTPException) as error:
+            self.connection.close()
+            self.recorder.record(step, 0, ok=False)
+            raise FlowError(f'{step}: {error}')
+        seconds = time.perf_counter() - started
+        for header in response.headers.get_all('Set-Cookie', ()):
+            for name, morsel in SimpleCookie(header).items():
+                self.cookies[name] = morsel.value
+        ok = response.status == expect
+        self.recorder.record(step, seconds, ok)
+        if not ok:
+            raise FlowError(f'{step}: {response.status}')
+        return content
+
+    def get(self, step, path):
+        return self.request(f'GET {step}', 'GET', path)
+
+    def post(self, step, path, data):
+        return self.request(f'POST {step}', 'POST', path, data, expect=302)
+
+    def login(self, username):
+        self.get('users:login', '/auth/login/')
+        self.post('users:login', '/auth/login/', {
+            'username': username, 'password': PASSWORD,
+        })
+        self.username = username
+
+
+def create_users(count):
+    """Пользователи user0, user1, … с паролем PASSWORD."""
+    from django.contrib.auth import get_user_model
+    from django.contrib.auth.hashers import make_password
+
+    User = get_user_model()
+    password = make_password(PASSWORD)
+    User.objects.bulk_create(
+        User(username=f'user{number}', password=password)
+        for number in range(count)
+    )
+
+
+def serve(settings_module, server, database, port):
+    """Точка входа процесса-сервера."""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    if server == 'asgi':
+        from django.core.asgi import get_asgi_application
+        application = get_asgi_application()
+    else:
+        from django.core.wsgi import get_wsgi_application
+        application = get_wsgi_application()
+    from django.conf import settings
+
+    settings.DATABASES['default']['NAME'] = database
+    settings.DEBUG = False
+    # Журналы настраивает django.setup() внутри get_*_application:
+    # успешные запросы не пишутся, ошибки 4xx и 5xx — да.
+    logging.getLogger('django.server').setLevel(logging.WARNING)
+    if server == 'asgi':
+        # asyncio сам ставит TCP_NODELAY сокетам транспорта.
+        import uvicorn
+
+        uvicorn.run(application, host='127.0.0.1', port=port,
+                    log_level='warning')
+    else:
+        from django.core.servers.basehttp import WSGIServer, run
+
+        class NoDelayWSGIServer(WSGIServer):
+            def get_request(self):
+                connection, address = super().get_request()
+                connection.setsockopt(
+                    socket.IPPROTO_TCP, socket.TCP_NODELAY, 1
+                )
+                return connection, address
+
+        run('127.0.0.1', port, application, threading=True,
+            server_cls=NoDelayWSGIServer)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(module, directory, server, database):
+    port = free_port()
+    process = subprocess.Popen(
+        [sys.executable, '-m', module, '--serve', server,
+         '--database', database, '--port', str(port)],
+        cwd=directory,
+        stdout=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + SERVER_START_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            sys.exit('Сервер не запустился')
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return process, port
+        except OSError:
+            time.sleep(0.1)
+    process.terminate()
+    sys.exit('Сервер не ответил за {} с'.format(SERVER_START_TIMEOUT))
+
+
+def run_load(port, flow, args):
+    recorder = Recorder()
+    stop = Event()
+
+    def user(number):
+        rng = random.Random(f'{args.seed}-{number}')
+        client = Client(port, recorder)
+        try:
+            client.login(f'user{number}')
+        except FlowError:
+            return
+        while not stop.is_set():
+            try:
+                flow(client, rng)
+            except FlowError:
+                pass
+
+    threads = [
+        Thread(target=user, args=(number,)) for number in range(args.users)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.warmup)
+    recorder.active = True
+    started = time.perf_counter()
+    time.sleep(args.seconds)
+    recorder.active = False
+    seconds = time.perf_counter() - started
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return recorder, seconds
+
+
+def percentile(values, percent):
+    """Перцентиль по ближайшему рангу; values отсортированы."""
+    rank = max(1, math.ceil(percent / 100 * len(values)))
+    return values[rank - 1]
+
+
+def summarize(recorder, seconds):
+    steps = dict(recorder.latencies)
+    steps['total'] = [
+        value for values in recorder.latencies.values() for value in values
+    ]
+    results = {}
+    for step, values in sorted(steps.items()):
+        values = sorted(values)
+        errors = (sum(recorder.errors.values()) if step == 'total'
+                  else recorder.errors[step])
+        result = {
+            'requests': len(values),
+            'errors': errors,
+            'rps': round(len(values) / seconds, 1),
+        }
+        for percent in PERCENTILES:
+            result[f'p{percent}_ms'] = round(
+                percentile(values, percent) * 1000, 2
+            ) if values else None
+        results[step] = result
+    return results
+
+
+def report(results):
+    print(f'{"шаг":28} {"запросов":>9} {"ошибок":>7} {"в с":>8} '
+          + ' '.join(f'{f"p{percent}, мс":>9}' for percent in PERCENTILES))
+    for step, result in results.items():
+        print(f'{step:28} {result["requests"]:9} {result["errors"]:7} '
+              f'{result["rps"]:8.1f} ' + ' '.join(
+                  f'{result[f"p{percent}_ms"] or 0:9.1f}'
+                  for percent in PERCENTILES
+              ))
+
+
+def compare(baseline, results, tolerance):
+    """Печатает изменения p95 и пропускной способности; число регрессий."""
+    regressions = 0
+    print(f'\nСравнение с {baseline["meta"]["created"]}:')
+    for step, result in results.items():
+        old = baseline['results'].get(step)
+        if not old or not old['p95_ms'] or not result['p95_ms']:
+            continue
+        p95_change = result['p95_ms'] / old['p95_ms'] - 1
+        rps_change = result['rps'] / old['rps'] - 1 if old['rps'] else 0
+        regressed = p95_change > tolerance or rps_change < -tolerance
+        regressions += regressed
+        print(f'{step:28} p95 {p95_change:+7.1%}   в с {rps_change:+7.1%}'
+              + ('   РЕГРЕССИЯ' if regressed else ''))
+    return regressions
+
+
+def main(*, project, settings_module, module, directory, description,
+         add_arguments, seed):
+    """
+    Разбирает аргументы, готовит данные и проводит замер.
+
+    add_arguments(parser) добавляет параметры данных проекта,
+    seed(args) создаёт данные в пустой базе с пользователями и
+    возвращает сценарий flow(client, rng) и параметры для meta.
+    """
+    parser = argparse.ArgumentParser(description=description.splitlines()[1])
+    parser.add_argument('--server', choices=('wsgi', 'asgi'), default='wsgi')
+    parser.add_argument('--users', type=int, default=20,
+                        help='Сколько виртуальных пользователей.')
+    parser.add_argument('--seconds', type=float, default=30,
+                        help='Сколько длится замер.')
+    parser.add_argument('--warmup', type=float, default=5,
+                        help='Сколько секунд нагрузки не учитывается.')
+    add_arguments(parser)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', type=Path,
+                        help='Куда записать результат в JSON.')
+    parser.add_argument('--compare', type=Path,
+                        help='JSON прежнего прогона для сравнения.')
+    parser.add_argument('--tolerance', type=float, default=0.1,
+                        help='Допустимое ухудшение, доля.')
+    parser.add_argument('--serve', choices=('wsgi', 'asgi'),
+                        help=argparse.SUPPRESS)
+    parser.add_argument('--database', help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.serve:
+        serve(settings_module, args.serve, args.database, args.port)
+        return
+    if args.server == 'asgi' and importlib.util.find_spec('uvicorn') is None:
+        parser.error('для --server asgi нужен uvicorn: pip install uvicorn')
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    django.setup()
+    from django.conf import settings
+    from django.core.management import call_command
+    from django.db import connections
+
+    database = str(Path(tempfile.mkdtemp()) / 'db.sqlite3')
+    settings.DATABASES['default']['NAME'] = database
+    call_command('migrate', verbosity=0)
+    create_users(args.users)
+    flow, data = seed(args)
+    connections.close_all()
+    print(f'Пользователей: {args.users}, сервер: {args.server}')
+    process, port = start_server(module, directory, args.server, database)
+    try:
+        recorder, seconds = run_load(port, flow, args)
+    finally:
+        process.terminate()
+        process.wait()
+    results = summarize(recorder, seconds)
+    report(results)
+    run = {
+        'meta': {
+            'project': project,
+            'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'server': args.server,
+            'users': args.users,
+            'seconds': args.seconds,
+            **data,
+            'database_profile': os.getenv('DATABASE_PROFILE', 'development'),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+        },
+        'results': results,
+    }
+    if args.output:
+        args.output.write_text(
+            json.dumps(run, ensure_ascii=False, indent=2), encoding='utf-8'
+        )
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding='utf-8'))
+        if compare(baseline, results, args.tolerance):
+            sys.exit(1)
@@ -0,0 +1,143 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+FORWARD = 'n'
+BACKWARD = 'p'
+
+
+class InvalidCursor(Exception):
+    """Курсор не удалось разобрать."""
+
+
+class KeysetPage:
+    """Страница выборки, полученная по курсору."""
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+
+class KeysetPaginator:
+    """
+    Постраничный вывод по ключу вместо OFFSET.
+
+    Страница выбирается условием «строго после последней записи
+    предыдущей страницы», поэтому стоимость запроса не зависит от того,
+    насколько далеко пролистана выборка. Ключ должен быть уникальным:
+    последним полем в ordering указывается первичный ключ.
+    """
+
+    def __init__(self, queryset, ordering, per_page):
+        self.queryset = queryset
+        self.ordering = tuple(ordering)
+        self.per_page = per_page
+        self.fields = tuple(key.lstrip('-') for key in self.ordering)
+
+    def encode_cursor(self, obj, direction):
+        values = [
+            self._get_field(name).value_to_string(obj)
+            for name in self.fields
+        ]
+        raw = json.dumps([direction, values], separators=(',', ':'))
+        return urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            direction, values = json.loads(urlsafe_b64decode(padded))
+            if (direction not in (FORWARD, BACKWARD)
+                    or len(values) != len(self.fields)):
+                raise ValueError
+            values = [
+                self._get_field(name).to_python(value)
+                for name, value in zip(self.fields, values)
+            ]
+        except (BinasciiError, TypeError, ValueError, ValidationError):
+            raise InvalidCursor(cursor)
+        return direction, values
+
+    def page(self, cursor=None):
+        """Возвращает страницу, следующую за курсором (или первую)."""
+        if not cursor:
+            rows = self._fetch(self.ordering)
+            return self._build_page(rows, has_next=len(rows) > self.per_page)
+        direction, values = self.decode_cursor(cursor)
+        if direction == FORWARD:
+            rows = self._fetch(self.ordering, values)
+            return self._build_page(
+                rows, has_next=len(rows) > self.per_page, has_previous=True
+            )
+        rows = self._fetch(self._reversed_ordering(), values)
+        if not rows:
+            return self.page()
+        has_previous = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        rows.reverse()
+        return self._build_page(rows, has_next=True, has_previous=has_previous)
+
+    def _get_field(self, name):
+        return self.queryset.model._meta.get_field(name)
+
+    def _reversed_ordering(self):
+        return tuple(
+            key[1:] if key.startswith('-') else f'-{key}'
+            for key in self.ordering
+        )
+
+    def _seek_filter(self, ordering, values):
+        """
+        Условие «после ключа values» в порядке ordering.
+
+        Для ключа (a, b) получается a < x OR (a = x AND b < y);
+        дублирующее a <= x позволяет базе сузить диапазон по индексу.
+        """
+        conditions = []
+        for position, key in enumerate(ordering):
+            lookup = 'lt' if key.startswith('-') else 'gt'
+            equal = dict(zip(self.fields[:position], values[:position]))
+            equal[f'{self.fields[position]}__{lookup}'] = values[position]
+            conditions.append(Q(**equal))
+        lookup = 'lte' if ordering[0].startswith('-') else 'gte'
+        return Q(**{f'{self.fields[0]}__{lookup}': values[0]}) & reduce(
+            or_, conditions
+        )
+
+    def _fetch(self, ordering, values=None):
+        queryset = self.queryset.order_by(*ordering)
+        if values is not None:
+            queryset = queryset.filter(self._seek_filter(ordering, values))
+        return list(queryset[:self.per_page + 1])
+
+    def _build_page(self, rows, has_next=False, has_previous=False):
+        rows = rows[:self.per_page]
+        if not rows:
+            return KeysetPage(rows)
+        return KeysetPage(
+            rows,
+            next_cursor=(
+                self.encode_cursor(rows[-1], FORWARD) if has_next else None
+            ),
+            previous_cursor=(
+                self.encode_cursor(rows[0], BACKWARD)
+                if has_previous else None
+            ),
+        )
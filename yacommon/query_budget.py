@@ -0,0 +1,116 @@
+"""
+Бюджет SQL-запросов на страницу и поиск N+1.
+
+QueryBudgetMiddleware записывает запросы, выполненные во время GET/HEAD,
+и сравнивает их число с QUERY_BUDGETS для имени маршрута
+(«news:home», «notes:detail»...). Запросы одной формы, повторённые больше
+QUERY_REPEAT_LIMIT раз, считаются N+1 — например, счётчик комментариев,
+запрошенный в шаблоне для каждой новости. Нарушение пишется в журнал,
+а при QUERY_BUDGET_RAISE = True (в тестах) приводит к исключению.
+"""
+import asyncio
+import logging
+import re
+from collections import Counter
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.utils.deprecation import MiddlewareMixin
+
+logger = logging.getLogger(__name__)
+
+SAFE_METHODS = ('GET', 'HEAD')
+IN_LIST_RE = re.compile(r'IN \((?:%s, )*%s\)')
+
+_recorder = ContextVar('query_recorder', default=None)
+
+
+class QueryBudgetExceeded(Exception):
+    """Страница выполнила больше запросов, чем ей положено."""
+
+
+def query_shape(sql):
+    """Форма запроса: параметры уже вынесены, списки IN схлопываются."""
+    return IN_LIST_RE.sub('IN (...)', sql)
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    Обёртка execute, которую yacommon.signals ставит каждому соединению.
+
+    Пока запрос не записывается, она только читает ContextVar.
+    ContextVar передаётся и в потоки sync_to_async, поэтому запросы
+    асинхронных представлений тоже попадают в запись.
+    """
+    queries = _recorder.get()
+    if queries is not None:
+        queries.append(sql)
+    return execute(sql, params, many, context)
+
+
+def install(connection):
+    """
+    Ставит обёртку в начало списка.
+
+    Соединение может открыться внутри connection.execute_wrapper(),
+    который на выходе снимает последнюю обёртку списка: добавленная
+    в конец, наша обёртка оказалась бы снята вместо чужой.
+    """
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, record_query)
+
+
+def check(view_name, queries):
+    """Возвращает описание нарушений или пустой список."""
+    problems = []
+    budget = settings.QUERY_BUDGETS.get(view_name)
+    if budget is not None and len(queries) > budget:
+        problems.append(
+            f'{len(queries)} запросов при бюджете {budget}'
+        )
+    for shape, count in Counter(map(query_shape, queries)).items():
+        if count > settings.QUERY_REPEAT_LIMIT:
+            problems.append(f'N+1: {count} раз {shape}')
+    return problems
+
+
+class QueryBudgetMiddleware(MiddlewareMixin):
+    """Проверяет запросы страницы; ставится первым в MIDDLEWARE."""
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self):
+            return self.__acall__(request)
+        if request.method not in SAFE_METHODS:
+            return self.get_response(request)
+        queries = []
+        token = _recorder.set(queries)
+        try:
+            response = self.get_response(request)
+        finally:
+            _recorder.reset(token)
+        self.report(request, queries)
+        return response
+
+    async def __acall__(self, request):
+        if request.method not in SAFE_METHODS:
+            return await self.get_response(request)
+        queries = []
+        token = _recorder.set(queries)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _recorder.reset(token)
+        self.report(request, queries)
+        return response
+
+    def report(self, request, queries):
+        match = request.resolver_match
+        if match is None:
+            return
+        problems = check(match.view_name, queries)
+        if not problems:
+            return
+        message = '{}: {}'.format(match.view_name, '; '.join(problems))
+        if settings.QUERY_BUDGET_RAISE:
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
@@ -0,0 +1,97 @@
+"""
+Чтение с реплик, запись в основную базу.
+
+Реплики перечислены в DATABASE_REPLICAS. После изменяющего запроса
+(POST и т. п.) пользователь DATABASE_PRIMARY_PIN_SECONDS секунд читает
+из основной базы, чтобы сразу увидеть свой комментарий или заметку,
+даже если реплика ещё не догнала основную базу. Признак хранится
+в cookie.
+"""
+import asyncio
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.deprecation import MiddlewareMixin
+
+PIN_COOKIE = 'primary_pin'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+_read_db = ContextVar('read_db', default=None)
+
+
+def choose_replica():
+    replicas = settings.DATABASE_REPLICAS
+    return random.choice(replicas) if replicas else DEFAULT_DB_ALIAS
+
+
+class PrimaryReplicaRouter:
+    """
+    Запись и миграции — в основную базу, чтение — с реплики.
+
+    В пределах запроса все чтения идут в одну базу, выбранную
+    PrimaryPinMiddleware. Вне запросов — в командах manage.py и в фоновых
+    потоках — чтение идёт из основной базы: команда, пересчитывающая
+    или дополняющая данные, не должна читать отставшую реплику.
+    """
+
+    def db_for_read(self, model, **hints):
+        return _read_db.get() or DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # На репликах те же данные, что и в основной базе.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+class PrimaryPinMiddleware(MiddlewareMixin):
+    """
+    Выбирает базу для чтения на запрос и ставит cookie после записи.
+
+    Работает и под ASGI без перехода в поток: база для чтения хранится
+    в ContextVar, который sync_to_async передаёт в поток вместе с запросом.
+    """
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = self.pin(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            _read_db.reset(token)
+        return self.set_cookie(request, response)
+
+    async def __acall__(self, request):
+        token = self.pin(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _read_db.reset(token)
+        return self.set_cookie(request, response)
+
+    def pin(self, request):
+        pinned = (
+            request.method not in SAFE_METHODS
+            or PIN_COOKIE in request.COOKIES
+        )
+        return _read_db.set(
+            DEFAULT_DB_ALIAS if pinned else choose_replica()
+        )
+
+    def set_cookie(self, request, response):
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            response.set_cookie(
+                PIN_COOKIE,
+                '1',
+                max_age=settings.DATABASE_PRIMARY_PIN_SECONDS,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
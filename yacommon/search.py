@@ -0,0 +1,148 @@
+"""
+Бэкенды полнотекстового поиска.
+
+Индекс хранит основы слов (см. stemmer), поэтому запрос находит
+и другие формы слова. SQLiteFTSBackend ищет по таблице FTS5 и ранжирует
+результаты по bm25, SimpleBackend подходит для любой базы, но
+просматривает таблицу целиком. Модель, поля и бэкенд выбирает
+get_backend() в search.py приложения.
+"""
+from functools import reduce
+from operator import and_, or_
+
+from django.db import connections, router, transaction
+from django.db.models import Q
+
+from .stemmer import stem, stem_text, words
+
+MAX_QUERY_WORDS = 10
+
+
+def query_stems(query):
+    stems = [stem(word) for word in words(query)]
+    return [item for item in dict.fromkeys(stems) if item][:MAX_QUERY_WORDS]
+
+
+class SimpleBackend:
+    """
+    Поиск через icontains по основам слов; отдельного индекса нет.
+
+    Рассчитан на базы, где icontains понимает регистр кириллицы:
+    в SQLite он не различает регистр только для латиницы.
+    """
+
+    def __init__(self, model, fields, weights=None, scope=None):
+        self.model = model
+        self.fields = tuple(fields)
+        self.scope = scope
+
+    def index(self, obj):
+        pass
+
+    def remove(self, pk):
+        pass
+
+    def rebuild(self):
+        pass
+
+    def search(self, query, limit, **scope):
+        """Возвращает id найденных объектов, лучшие первыми."""
+        stems = query_stems(query)
+        if not stems:
+            return []
+        condition = reduce(and_, (
+            reduce(or_, (
+                Q(**{f'{field}__icontains': item}) for field in self.fields
+            ))
+            for item in stems
+        ))
+        return list(
+            self.model.objects.filter(condition, **scope)
+            .order_by('-pk').values_list('pk', flat=True)[:limit]
+        )
+
+
+class SQLiteFTSBackend(SimpleBackend):
+    """
+    Поиск по виртуальной таблице FTS5 <таблица модели>_search.
+
+    Таблицу создаёт миграция; rowid совпадает с id объекта, поле scope
+    хранится неиндексируемой колонкой для отбора результатов.
+    """
+
+    def __init__(self, model, fields, weights=None, scope=None):
+        super().__init__(model, fields, weights, scope)
+        self.weights = tuple(weights or (1.0,) * len(self.fields))
+        self.table = f'{model._meta.db_table}_search'
+        self.columns = self.fields + ((scope,) if scope else ())
+
+    def _cursor(self, write=True):
+        route = router.db_for_write if write else router.db_for_read
+        return connections[route(self.model)].cursor()
+
+    def _row(self, values):
+        """(id, поля..., scope) → строка индекса с основами слов."""
+        fields_end = len(self.fields) + 1
+        return [
+            values[0],
+            *(stem_text(value or '') for value in values[1:fields_end]),
+            *values[fields_end:],
+        ]
+
+    def _insert(self, cursor, rows):
+        cursor.executemany(
+            'INSERT INTO {} (rowid, {}) VALUES (%s{})'.format(
+                self.table,
+                ', '.join(self.columns),
+                ', %s' * len(self.columns),
+            ),
+            rows,
+        )
+
+    def index(self, obj):
+        values = [obj.pk] + [getattr(obj, name) for name in self.columns]
+        with self._cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {self.table} WHERE rowid = %s', [obj.pk]
+            )
+            self._insert(cursor, [self._row(values)])
+
+    def remove(self, pk):
+        with self._cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table} WHERE rowid = %s', [pk])
+
+    def rebuild(self, chunk_size=2000):
+        """Заново строит индекс по всем объектам модели в одной транзакции."""
+        queryset = self.model._base_manager.values_list('pk', *self.columns)
+        using = router.db_for_write(self.model)
+        with transaction.atomic(using=using), self._cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table}')
+            chunk = []
+            for values in queryset.iterator(chunk_size=chunk_size):
+                chunk.append(self._row(values))
+                if len(chunk) >= chunk_size:
+                    self._insert(cursor, chunk)
+                    chunk = []
+            self._insert(cursor, chunk)
+
+    def search(self, query, limit, **scope):
+        """
+        Возвращает id найденных объектов, самые подходящие первыми.
+
+        Каждое слово запроса ищется как префикс основы, все слова
+        должны встретиться в объекте.
+        """
+        stems = query_stems(query)
+        if not stems:
+            return []
+        sql = f'SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s'
+        params = [' '.join(f'"{item}"*' for item in stems)]
+        for name, value in scope.items():
+            sql += f' AND {name} = %s'
+            params.append(value)
+        weights = ', '.join(map(str, self.weights))
+        sql += f' ORDER BY bm25({self.table}, {weights}) LIMIT %s'
+        params.append(limit)
+        with self._cursor(write=False) as cursor:
+            cursor.execute(sql, params)
+            return [row[0] for row in cursor.fetchall()]
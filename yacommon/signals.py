@@ -0,0 +1,30 @@
+"""
+Обработчики connection_created, общие для обоих проектов.
+
+Подключаются, когда AppConfig.ready() приложения импортирует модуль.
+"""
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from . import instrumentation, query_budget
+
+
+@receiver(connection_created)
+def set_sqlite_pragmas(sender, connection, **kwargs):
+    """Применяет SQLITE_PRAGMAS к каждому новому соединению с SQLite."""
+    if connection.vendor != 'sqlite' or not settings.SQLITE_PRAGMAS:
+        return
+    with connection.cursor() as cursor:
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+@receiver(connection_created)
+def install_query_recorder(sender, connection, **kwargs):
+    query_budget.install(connection)
+
+
+@receiver(connection_created)
+def install_query_timer(sender, connection, **kwargs):
+    instrumentation.install(connection)
@@ -0,0 +1,123 @@
+"""
+Стеммер для русского языка по алгоритму Snowball.
+
+Отрезает окончания, чтобы «редиска», «редиской» и «редиски» попали
+в поисковый индекс одним словом. Слова на латинице не меняются.
+"""
+import re
+from functools import lru_cache
+
+VOWELS = 'аеиоуыэюя'
+WORD_RE = re.compile(r'[^\W_]+')
+
+
+def endings(after_a=(), plain=()):
+    """
+    Группа окончаний для _remove.
+
+    Окончания after_a снимаются, только если перед ними стоит «а» или «я».
+    """
+    return (
+        frozenset(after_a),
+        frozenset(plain),
+        max(map(len, (*after_a, *plain))),
+    )
+
+
+PERFECTIVE_GERUND = endings(
+    ('в', 'вши', 'вшись'),
+    ('ив', 'ивши', 'ившись', 'ыв', 'ывши', 'ывшись'),
+)
+REFLEXIVE = endings(plain=('ся', 'сь'))
+ADJECTIVE = endings(plain=(
+    'ее', 'ие', 'ые', 'ое', 'ими', 'ыми', 'ей', 'ий', 'ый', 'ой', 'ем',
+    'им', 'ым', 'ом', 'его', 'ого', 'ему', 'ому', 'их', 'ых', 'ую', 'юю',
+    'ая', 'яя', 'ою', 'ею',
+))
+PARTICIPLE = endings(('ем', 'нн', 'вш', 'ющ', 'щ'), ('ивш', 'ывш', 'ующ'))
+VERB = endings(
+    ('ла', 'на', 'ете', 'йте', 'ли', 'й', 'л', 'ем', 'н', 'ло', 'но', 'ет',
+     'ют', 'ны', 'ть', 'ешь', 'нно'),
+    ('ила', 'ыла', 'ена', 'ейте', 'уйте', 'ите', 'или', 'ыли', 'ей', 'уй',
+     'ил', 'ыл', 'им', 'ым', 'ен', 'ило', 'ыло', 'ено', 'ят', 'ует', 'уют',
+     'ит', 'ыт', 'ены', 'ить', 'ыть', 'ишь', 'ую', 'ю'),
+)
+NOUN = endings(plain=(
+    'а', 'ев', 'ов', 'ие', 'ье', 'е', 'иями', 'ями', 'ами', 'еи', 'ии', 'и',
+    'ией', 'ей', 'ой', 'ий', 'й', 'иям', 'ям', 'ием', 'ем', 'ам', 'ом', 'о',
+    'у', 'ах', 'иях', 'ях', 'ы', 'ь', 'ию', 'ью', 'ю', 'ия', 'ья', 'я',
+))
+DERIVATIONAL = endings(plain=('ост', 'ость'))
+SUPERLATIVE = endings(plain=('ейш', 'ейше'))
+
+
+def normalize(text):
+    return text.casefold().replace('ё', 'е')
+
+
+def words(text):
+    return WORD_RE.findall(normalize(text))
+
+
+def _region(word, start):
+    """Начало области после первой согласной, идущей за гласной."""
+    for position in range(start + 1, len(word)):
+        if word[position] not in VOWELS and word[position - 1] in VOWELS:
+            return position + 1
+    return len(word)
+
+
+def _remove(word, start, group):
+    """
+    Отрезает самое длинное окончание группы, лежащее после start.
+
+    Возвращает None, если снять нечего.
+    """
+    after_a, plain, longest = group
+    for length in range(min(len(word) - start, longest), 0, -1):
+        ending = word[-length:]
+        if ending in plain:
+            return word[:-length]
+        if ending in after_a:
+            if (len(word) - length - 1 >= start
+                    and word[-length - 1] in 'ая'):
+                return word[:-length]
+            return None
+    return None
+
+
+@lru_cache(maxsize=100000)
+def stem(word):
+    """Основа слова; слова в тексте повторяются, поэтому кэшируется."""
+    word = normalize(word)
+    rv = next(
+        (position + 1 for position, char in enumerate(word)
+         if char in VOWELS),
+        len(word),
+    )
+    r2 = _region(word, _region(word, 0))
+    stemmed = _remove(word, rv, PERFECTIVE_GERUND)
+    if stemmed is None:
+        word = _remove(word, rv, REFLEXIVE) or word
+        stemmed = _remove(word, rv, ADJECTIVE)
+        if stemmed is not None:
+            stemmed = _remove(stemmed, rv, PARTICIPLE) or stemmed
+        else:
+            stemmed = (
+                _remove(word, rv, VERB) or _remove(word, rv, NOUN) or word
+            )
+    word = stemmed
+    if word.endswith('и') and len(word) > rv:
+        word = word[:-1]
+    word = _remove(word, max(r2, rv), DERIVATIONAL) or word
+    word = _remove(word, rv, SUPERLATIVE) or word
+    if word.endswith('нн') and len(word) - 1 > rv:
+        word = word[:-1]
+    elif word.endswith('ь') and len(word) > rv:
+        word = word[:-1]
+    return word
+
+
+def stem_text(text):
+    """Текст для поискового индекса: основы слов через пробел."""
+    return ' '.join(stem(word) for word in words(text))
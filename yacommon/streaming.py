@@ -0,0 +1,189 @@
+"""
+Потоковая выгрузка и загрузка данных в формате фикстур Django.
+
+В отличие от dumpdata/loaddata ни файл, ни выборка целиком в память
+не попадают: выгрузка идёт через iterator(chunk_size=...), загрузка
+читает записи по одной и сохраняет их через bulk_create пачками.
+Поддерживается JSONL (объект на строку) и обычный JSON-массив фикстур.
+"""
+import json
+from collections import Counter, defaultdict
+from datetime import datetime
+from contextlib import contextmanager
+
+from django.apps import apps
+from django.core.serializers import python
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+READ_SIZE = 64 * 1024
+
+
+class FixtureEncoder(DjangoJSONEncoder):
+    """В отличие от DjangoJSONEncoder не отбрасывает микросекунды."""
+
+    def default(self, o):
+        if isinstance(o, datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def dump(models, stream, chunk_size=2000):
+    """Пишет объекты моделей в stream в формате JSONL."""
+    serializer = python.Serializer()
+    counts = Counter()
+    for model in models:
+        queryset = model._base_manager.order_by('pk')
+        chunk = []
+        for obj in queryset.iterator(chunk_size=chunk_size):
+            chunk.append(obj)
+            if len(chunk) >= chunk_size:
+                counts[model._meta.label] += write_chunk(
+                    serializer, chunk, stream
+                )
+                chunk = []
+        counts[model._meta.label] += write_chunk(serializer, chunk, stream)
+    return counts
+
+
+def write_chunk(serializer, chunk, stream):
+    for record in serializer.serialize(chunk):
+        stream.write(json.dumps(
+            record, cls=FixtureEncoder, ensure_ascii=False
+        ))
+        stream.write('\n')
+    return len(chunk)
+
+
+def iter_records(stream):
+    """
+    Лениво читает записи из JSONL или из JSON-массива.
+
+    Формат определяется по первому значащему символу.
+    """
+    head = stream.read(READ_SIZE)
+    if head.lstrip().startswith('['):
+        yield from iter_json_array(stream, head)
+        return
+    pending = ''
+    while head:
+        *lines, pending = (pending + head).split('\n')
+        for line in lines:
+            if line.strip():
+                yield json.loads(line)
+        head = stream.read(READ_SIZE)
+    if pending.strip():
+        yield json.loads(pending)
+
+
+def iter_json_array(stream, buffer):
+    """Разбирает JSON-массив по элементам, не читая его целиком."""
+    decoder = json.JSONDecoder()
+    position = buffer.index('[') + 1
+    eof = False
+    while True:
+        while position < len(buffer) and buffer[position] in ' \t\r\n,':
+            position += 1
+        if position < len(buffer) and buffer[position] == ']':
+            return
+        try:
+            record, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            chunk = stream.read(READ_SIZE)
+            eof = not chunk
+            buffer = buffer[position:] + chunk
+            position = 0
+            continue
+        yield record
+        position = end
+
+
+@contextmanager
+def raw_timestamps():
+    """
+    Сохраняет значения auto_now/auto_now_add, заданные в объектах.
+
+    bulk_create иначе перезаписал бы их текущим временем, а loaddata
+    сохраняет их из файла как есть.
+    """
+    fields = [
+        field
+        for model in apps.get_models()
+        for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False)
+        or getattr(field, 'auto_now_add', False)
+    ]
+    flags = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in flags:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def load(records, chunk_size=2000, ignore_conflicts=False):
+    """
+    Сохраняет записи фикстур пачками, возвращает счётчики по моделям.
+
+    Пачка сохраняется в порядке первого появления моделей в файле, так
+    что новости, выгруженные раньше комментариев, попадают в базу раньше.
+    Связи многие-ко-многим (например, группы и права пользователей)
+    записываются в промежуточные таблицы после объектов пачки.
+    """
+    counts = Counter()
+    buffer = {}
+    buffered = 0
+    with raw_timestamps():
+        for deserialized in python.Deserializer(records):
+            buffer.setdefault(type(deserialized.object), []).append(
+                deserialized
+            )
+            buffered += 1
+            if buffered >= chunk_size:
+                flush(buffer, counts, ignore_conflicts)
+                buffered = 0
+        flush(buffer, counts, ignore_conflicts)
+    return counts
+
+
+def flush(buffer, counts, ignore_conflicts):
+    with transaction.atomic():
+        for model, chunk in buffer.items():
+            model._base_manager.bulk_create(
+                [deserialized.object for deserialized in chunk],
+                ignore_conflicts=ignore_conflicts,
+            )
+            counts[model._meta.label] += len(chunk)
+        for model, chunk in buffer.items():
+            save_m2m(model, chunk, ignore_conflicts)
+    buffer.clear()
+
+
+def save_m2m(model, chunk, ignore_conflicts):
+    """Сохраняет строки промежуточных таблиц для m2m-полей пачки."""
+    rows = defaultdict(list)
+    for deserialized in chunk:
+        pk = deserialized.object.pk
+        for name, values in deserialized.m2m_data.items():
+            if not values:
+                continue
+            if pk is None:
+                raise ValueError(
+                    f'{model._meta.label}: запись со связями {name} '
+                    f'должна содержать pk'
+                )
+            field = model._meta.get_field(name)
+            through = field.remote_field.through
+            source = f'{field.m2m_field_name()}_id'
+            target = f'{field.m2m_reverse_field_name()}_id'
+            rows[through].extend(
+                through(**{source: pk, target: value}) for value in values
+            )
+    for through, objects in rows.items():
+        through._base_manager.bulk_create(
+            objects, ignore_conflicts=ignore_conflicts
+        )
@@ -0,0 +1,112 @@
+"""
+Синтетические данные для проверки на больших объёмах.
+
+Общая часть команд generate_data: текст из словаря проекта,
+распределение по закону Ципфа, порции и пользователи. Строки
+генерируются порциями в процессах multiprocessing, а вставляет
+их основной процесс: SQLite пишет в один поток. Каждая порция получает
+свой генератор случайных чисел из (seed, вид, начало порции), поэтому
+результат зависит от seed, размеров и размера порции, но не от числа
+процессов.
+Модуль не обращается к Django, чтобы работать и при запуске
+процессов через spawn; вставку делает yacommon.bulk.
+"""
+import random
+
+NAMES = (
+    'Анна', 'Иван', 'Мария', 'Пётр', 'Ольга', 'Сергей', 'Елена',
+    'Дмитрий', 'Наталья', 'Алексей', 'Татьяна', 'Михаил', 'Ирина',
+    'Андрей', 'Светлана', 'Николай', 'Юлия', 'Владимир', 'Ксения',
+)
+
+
+def sentence(rng, words, low, high):
+    chosen = rng.choices(words, k=rng.randint(low, high))
+    return ' '.join(chosen).capitalize() + '.'
+
+
+def paragraph(rng, words, low, high):
+    return ' '.join(
+        sentence(rng, words, 5, 15) for _ in range(rng.randint(low, high))
+    )
+
+
+def title(rng, words, max_length):
+    return sentence(rng, words, 2, 6)[:-1][:max_length]
+
+
+def zipf_weights(size, exponent, seed, kind):
+    """
+    Веса по закону Ципфа: у владельца ранга r вес 1 / r**exponent.
+
+    Ранги перемешаны, чтобы «популярными» не оказывались подряд первые id.
+    """
+    owners = list(range(size))
+    random.Random(f'{seed}-{kind}-ranks').shuffle(owners)
+    weights = [0.0] * size
+    for rank, owner in enumerate(owners, start=1):
+        weights[owner] = 1 / rank ** exponent
+    return weights
+
+
+def zipf_counts(total, weights):
+    """Раскладывает total объектов пропорционально весам, без остатка."""
+    if not weights:
+        return []
+    scale = total / sum(weights)
+    counts = [int(weight * scale) for weight in weights]
+    leftover = total - sum(counts)
+    heaviest = sorted(
+        range(len(weights)), key=weights.__getitem__, reverse=True
+    )
+    for owner in heaviest[:leftover]:
+        counts[owner] += 1
+    return counts
+
+
+def chunks(total, chunk_size):
+    """(начало, конец) порций для Pool.imap."""
+    return [
+        (start, min(start + chunk_size, total))
+        for start in range(0, total, chunk_size)
+    ]
+
+
+class Plan:
+    """
+    Размеры и распределения, общие для всех процессов.
+
+    Проекты наследуют его и добавляют свои объекты.
+    """
+
+    def __init__(self, seed, users, user_offset):
+        self.seed = seed
+        self.users = users
+        self.user_offset = user_offset
+
+    def rng(self, kind, start):
+        return random.Random(f'{self.seed}-{kind}-{start}')
+
+
+_plan = None
+
+
+def init_worker(plan):
+    global _plan
+    _plan = plan
+
+
+def current_plan():
+    """План, переданный процессу пула через init_worker."""
+    return _plan
+
+
+def make_users(bounds):
+    """Пользователи: (id, username)."""
+    start, end = bounds
+    rng = _plan.rng('users', start)
+    return [
+        (_plan.user_offset + index,
+         f'{rng.choice(NAMES)}_{_plan.user_offset + index}')
+        for index in range(start, end)
+    ]
@@ -0,0 +1,63 @@
+"""
+Прогрев и проверка шаблонов проекта.
+
+warm() компилирует каждый шаблон из TEMPLATES['DIRS'] и всё, что он
+подключает через {% extends %} и {% include %} с постоянным именем.
+С кэширующим загрузчиком (TEMPLATE_PROFILE = 'production') шаблоны
+остаются в его кэше, и первый запрос не ищет их на диске и не
+компилирует. AppConfig.ready() приложения прогревает шаблоны при старте
+и не даёт запуститься, если шаблон не найден; в остальных профилях
+то же самое сообщает `manage.py check`.
+"""
+from pathlib import Path
+
+from django.core.checks import Error, Tags, register
+from django.template import (TemplateDoesNotExist, TemplateSyntaxError,
+                             engines)
+from django.template.loader_tags import ExtendsNode, IncludeNode
+
+
+def project_template_names(engine):
+    for directory in map(Path, engine.dirs):
+        for path in sorted(directory.rglob('*.html')):
+            yield path.relative_to(directory).as_posix()
+
+
+def referenced_names(template):
+    """Имена шаблонов, которые template подключает по постоянному имени."""
+    for node in template.nodelist.get_nodes_by_type(
+            (ExtendsNode, IncludeNode)):
+        expression = (node.parent_name if isinstance(node, ExtendsNode)
+                      else node.template)
+        if isinstance(expression.var, str) and not expression.filters:
+            yield expression.var
+
+
+def warm():
+    """Компилирует шаблоны проекта; возвращает список ошибок."""
+    engine = engines['django'].engine
+    errors = []
+    seen = set()
+    queue = [(name, None) for name in project_template_names(engine)]
+    while queue:
+        name, parent = queue.pop(0)
+        if name in seen:
+            continue
+        seen.add(name)
+        try:
+            template = engine.get_template(name)
+        except TemplateDoesNotExist:
+            errors.append(f'{parent}: не найден шаблон {name}')
+            continue
+        except TemplateSyntaxError as error:
+            errors.append(f'{name}: {error}')
+            continue
+        queue.extend(
+            (child, name) for child in referenced_names(template)
+        )
+    return errors
+
+
+@register(Tags.templates)
+def check_templates(app_configs, **kwargs):
+    return [Error(message, id='yacommon.E001') for message in warm()]